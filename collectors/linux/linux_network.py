@@ -1,15 +1,175 @@
-from helpers.unix import run_cmd, get_evidence
+from helpers.cache import ttl_cache
+from helpers.unix import run_cmd, get_evidence, read_small_file
+import copy
+import mmap
 import os
+import re
+import shutil
+import socket
+import struct
 from typing import Any
 
+# Cache of binary name -> resolved path (or None if not installed).
+# Minimal containers often lack iproute2/net-tools, so we look each tool up
+# once instead of paying a failed fork/exec every time we try it.
+_BINARIES: dict[str, str | None] = {}
+
+
+def _have(binary: str) -> bool:
+    """Return True if `binary` is on PATH (result cached per process)."""
+    if binary not in _BINARIES:
+        _BINARIES[binary] = shutil.which(binary)
+    return _BINARIES[binary] is not None
+
+
+def _run_if_available(cmd: tuple[str, ...]) -> tuple[int, str, str]:
+    """
+    run_cmd, but skip the spawn entirely when the binary is missing.
+    Uses the shell convention rc=127 for "command not found".
+    """
+    if not _have(cmd[0]):
+        return 127, "", f"{cmd[0]}: command not found"
+    return run_cmd(cmd)
+
+
+# Commands we may run, built once. The tuple itself is also what evidence["cmd"]
+# holds, so repeated calls share it instead of building a new list each time.
+_IP_ROUTE_DEFAULT_CMD = ("ip", "route", "show", "default")
+_ROUTE_N_CMD = ("route", "-n")
+_NETSTAT_RN_CMD = ("netstat", "-rn")
+_RESOLVECTL_STATUS_CMD = ("resolvectl", "status")
+
+# resolvectl status lines we care about, e.g.
+#   DNS Servers: 1.1.1.1 8.8.8.8
+#   DNS Domain: corp.example.com
+_RESOLVECTL_RE = re.compile(r"^[ \t]*(DNS Servers|DNS Domain|Domains|Search Domains):[ \t]*(.+)$", re.M)
+
+# resolv.conf directives we care about, e.g.
+#   nameserver 1.1.1.1
+#   search corp.example.com example.com
+_RESOLV_CONF_RE = re.compile(r"^[ \t]*(nameserver|search|domain)[ \t]+(\S.*?)[ \t]*$", re.M)
+_RESOLV_CONF_RE_BYTES = re.compile(rb"^[ \t]*(nameserver|search|domain)[ \t]+(\S.*?)[ \t]*$", re.M)
+
+# /etc/environment assignments: KEY=value, KEY="value" or KEY='value'
+_ENV_LINE_RE = re.compile(
+    r"""^[ \t]*([A-Za-z_][A-Za-z0-9_]*)[ \t]*=[ \t]*(?:"([^"\n]*)"|'([^'\n]*)'|(\S*))[ \t]*$""",
+    re.M,
+)
+
+# rtnetlink constants (linux/netlink.h, linux/rtnetlink.h)
+_NETLINK_ROUTE = 0
+_RTM_NEWROUTE = 24
+_RTM_GETROUTE = 26
+_NLM_F_REQUEST = 0x1
+_NLM_F_DUMP = 0x300
+_NLMSG_ERROR = 2
+_NLMSG_DONE = 3
+_RTN_UNICAST = 1
+_RT_TABLE_MAIN = 254
+_RTA_OIF = 4
+_RTA_GATEWAY = 5
+_RTA_TABLE = 15
+
+_NLMSGHDR = struct.Struct("=IHHII")     # len, type, flags, seq, pid
+_RTMSG = struct.Struct("=BBBBBBBBI")    # family, dst_len, src_len, tos, table, protocol, scope, type, flags
+_RTATTR = struct.Struct("=HH")          # len, type
+
+
+def _nl_align(n: int) -> int:
+    return (n + 3) & ~3
+
+
+def _parse_default_route(data: bytes, start: int, end: int) -> tuple[str | None, str | None] | None:
+    """
+    Parse one RTM_NEWROUTE body (rtmsg + attributes).
+    Returns (gateway, iface) if it is an IPv4 default route in the main table, else None.
+    """
+    _, dst_len, _, _, table, _, _, rtype, _ = _RTMSG.unpack_from(data, start)
+    if dst_len != 0 or rtype != _RTN_UNICAST:
+        return None
+
+    gateway: str | None = None
+    iface: str | None = None
+    pos = start + _RTMSG.size
+    while pos + _RTATTR.size <= end:
+        rta_len, rta_type = _RTATTR.unpack_from(data, pos)
+        if rta_len < _RTATTR.size:
+            break
+        value = data[pos + _RTATTR.size:pos + rta_len]
+        if rta_type == _RTA_GATEWAY:
+            gateway = socket.inet_ntop(socket.AF_INET, value)
+        elif rta_type == _RTA_OIF:
+            iface = socket.if_indextoname(struct.unpack("=I", value)[0])
+        elif rta_type == _RTA_TABLE:
+            # Full 32-bit table id (rtm_table only holds the low 8 bits)
+            table = struct.unpack("=I", value)[0]
+        pos += _nl_align(rta_len)
+
+    if table != _RT_TABLE_MAIN:
+        return None
+    return gateway, iface
+
+
+def _netlink_default_route() -> tuple[str | None, str | None]:
+    """
+    Ask the kernel for the IPv4 default route over rtnetlink (RTM_GETROUTE dump).
+
+    Same data `ip route show default` prints, without spawning a process,
+    and it works in containers that don't ship iproute2.
+    Raises OSError if netlink is unavailable (non-Linux, sandboxed, etc.).
+    """
+    with socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, _NETLINK_ROUTE) as sock:
+        sock.settimeout(2)
+        request = _NLMSGHDR.pack(
+            _NLMSGHDR.size + _RTMSG.size, _RTM_GETROUTE, _NLM_F_REQUEST | _NLM_F_DUMP, 1, 0
+        ) + _RTMSG.pack(socket.AF_INET, 0, 0, 0, 0, 0, 0, 0, 0)
+        sock.send(request)
+
+        while True:
+            data = sock.recv(65536)
+            offset = 0
+            while offset + _NLMSGHDR.size <= len(data):
+                msg_len, msg_type, _, _, _ = _NLMSGHDR.unpack_from(data, offset)
+                if msg_len < _NLMSGHDR.size:
+                    raise OSError("Malformed netlink message")
+                if msg_type == _NLMSG_DONE:
+                    return None, None
+                if msg_type == _NLMSG_ERROR:
+                    err = -struct.unpack_from("=i", data, offset + _NLMSGHDR.size)[0]
+                    raise OSError(err, os.strerror(err))
+                if msg_type == _RTM_NEWROUTE:
+                    route = _parse_default_route(data, offset + _NLMSGHDR.size, offset + msg_len)
+                    if route is not None:
+                        return route
+                offset += _nl_align(msg_len)
+
+
 # -----------------------------
 # 1) Default route / gateway
 # -----------------------------
-def get_linux_default_route() -> dict[str, Any]:
+# Shape shared by every get_linux_default_route outcome; each branch merges in
+# only the keys it changes (never mutate this dict in place).
+_DEFAULT_ROUTE_TEMPLATE: dict[str, Any] = {
+    "gateway": None,
+    "interface": None,
+    "not_checked": False,
+    "error": None,
+    "remediation": None,
+    "evidence": None,
+}
+
+# Routing tables rarely change mid-audit; re-read at most every 15 minutes.
+_ROUTE_TTL_S = 900
+
+
+def get_linux_default_route(force: bool = False) -> dict[str, Any]:
     """
     Linux: default route (gateway + primary interface).
 
-    Primary command (modern Linux):
+    Primary source:
+      - rtnetlink RTM_GETROUTE (no subprocess)
+
+    Primary command (if netlink is unavailable):
       - ip route show default
 
     Fallback commands (older systems):
@@ -30,54 +190,65 @@ def get_linux_default_route() -> dict[str, Any]:
       - ip route output is NOT key:value.
         Typical: "default via 192.168.1.1 dev eth0 proto dhcp metric 100"
         Parse tokens after "via" (gateway) and "dev" (interface).
+      - Commands whose binary is not installed are skipped (rc=127 in evidence).
+      - Successful lookups are reused for up to _ROUTE_TTL_S seconds (pass
+        force=True to re-read); a not_checked result is never kept, so the
+        next call tries again. Each call returns its own dict.
     """
-    # Try modern command first
-    cmd = ["ip", "route", "show", "default"]
-    rc, stdout, stderr = run_cmd(cmd)
-    evidence = get_evidence(cmd, rc, stdout, stderr)
-
+    if force:
+        _default_route.cache_clear()
+    result = _default_route()
+    if result["not_checked"]:
+        _default_route.cache_clear()
+    # Callers get their own copy (nested evidence included), never the cached one
+    return copy.deepcopy(result)
+
+
+@ttl_cache(seconds=_ROUTE_TTL_S)
+def _default_route() -> dict[str, Any]:
+    """get_linux_default_route's lookup; the result is shared, treat as read-only."""
     gateway: str | None = None
     iface: str | None = None
 
+    # Ask the kernel directly first; only fall back to the text tools on error.
+    netlink_error: str | None = None
+    try:
+        gateway, iface = _netlink_default_route()
+    except (OSError, struct.error) as e:
+        netlink_error = f"{type(e).__name__}: {e}"
+    else:
+        evidence = {"source": "netlink", "request": "RTM_GETROUTE", "table": "main"}
+        return _DEFAULT_ROUTE_TEMPLATE | {"gateway": gateway, "interface": iface, "evidence": evidence}
+
+    # Try modern command next
+    cmd = _IP_ROUTE_DEFAULT_CMD
+    rc, stdout, stderr = _run_if_available(cmd)
+    evidence = get_evidence(cmd, rc, stdout, stderr)
+
     if rc == 0 and stdout.strip():
         # Usually one line; still handle multiple lines safely.
         for line in stdout.splitlines():
-            s = line.strip()
-            if not s:
-                continue
-            tokens = s.split()
-
-            # Find "via <gateway>"
-            if "via" in tokens:
-                i = tokens.index("via")
-                if i + 1 < len(tokens):
-                    gateway = tokens[i + 1]
-
-            # Find "dev <iface>"
-            if "dev" in tokens:
-                i = tokens.index("dev")
-                if i + 1 < len(tokens):
-                    iface = tokens[i + 1]
+            # Single pass over the tokens: "via <gateway>" and "dev <iface>".
+            # next(it, None) consumes the value so it is never re-tested as a keyword.
+            it = iter(line.split())
+            for tok in it:
+                if tok == "via":
+                    gateway = next(it, None)
+                elif tok == "dev":
+                    iface = next(it, None)
 
             # If we got something, no need to keep scanning lines.
             if gateway or iface:
                 break
 
-        return {
-            "gateway": gateway,
-            "interface": iface,
-            "not_checked": False,
-            "error": None,
-            "remediation": None,
-            "evidence": evidence,
-        }
+        return _DEFAULT_ROUTE_TEMPLATE | {"gateway": gateway, "interface": iface, "evidence": evidence}
 
     # Fallback #1: route -n
     # Typical lines include:
     #   Destination Gateway     Genmask ... Iface
     #   0.0.0.0     192.168.1.1 0.0.0.0 ... eth0
-    cmd2 = ["route", "-n"]
-    rc2, out2, err2 = run_cmd(cmd2)
+    cmd2 = _ROUTE_N_CMD
+    rc2, out2, err2 = _run_if_available(cmd2)
     evidence2 = get_evidence(cmd2, rc2, out2, err2)
 
     if rc2 == 0 and out2.strip():
@@ -93,20 +264,13 @@ def get_linux_default_route() -> dict[str, Any]:
                 iface = parts[-1]
                 break
 
-        return {
-            "gateway": gateway,
-            "interface": iface,
-            "not_checked": False,
-            "error": None,
-            "remediation": None,
-            "evidence": evidence2,
-        }
+        return _DEFAULT_ROUTE_TEMPLATE | {"gateway": gateway, "interface": iface, "evidence": evidence2}
 
     # Fallback #2: netstat -rn
     # Typical includes a "default" row:
     #   default  192.168.1.1  ...  eth0
-    cmd3 = ["netstat", "-rn"]
-    rc3, out3, err3 = run_cmd(cmd3)
+    cmd3 = _NETSTAT_RN_CMD
+    rc3, out3, err3 = _run_if_available(cmd3)
     evidence3 = get_evidence(cmd3, rc3, out3, err3)
 
     if rc3 == 0 and out3.strip():
@@ -121,23 +285,15 @@ def get_linux_default_route() -> dict[str, Any]:
                 iface = parts[-1]
                 break
 
-        return {
-            "gateway": gateway,
-            "interface": iface,
-            "not_checked": False,
-            "error": None,
-            "remediation": None,
-            "evidence": evidence3,
-        }
+        return _DEFAULT_ROUTE_TEMPLATE | {"gateway": gateway, "interface": iface, "evidence": evidence3}
 
     # If everything failed
-    return {
-        "gateway": None,
-        "interface": None,
+    return _DEFAULT_ROUTE_TEMPLATE | {
         "not_checked": True,
         "error": stderr or stdout or err2 or out2 or err3 or out3 or "Could not determine default route",
         "remediation": "Ensure iproute2 is installed (ip command) or provide route/netstat; run with appropriate permissions.",
         "evidence": {
+            "netlink_error": netlink_error,
             "primary": evidence,
             "fallback_route": evidence2,
             "fallback_netstat": evidence3,
@@ -145,6 +301,46 @@ def get_linux_default_route() -> dict[str, Any]:
     }
 
 
+def _scan_resolv_conf(path: str, preview_lines: int = 50) -> tuple[list[tuple[str, str]], str]:
+    """
+    Return the (directive, value) pairs from a resolv.conf-style file, plus
+    the first `preview_lines` lines as text for evidence.
+
+    The file is mmap'd and scanned with a bytes regex straight from the page
+    cache, so only the matched values and the preview get decoded.
+    Empty or non-mappable files fall back to a plain read + str regex.
+
+    Raises OSError if the file can't be opened/read.
+    """
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        try:
+            mm = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            # ValueError: empty file; OSError: filesystem doesn't support mmap
+            mm = None
+        if mm is not None:
+            with mm:
+                pairs = [
+                    (m.group(1).decode("ascii"), m.group(2).decode("utf-8", errors="replace"))
+                    for m in _RESOLV_CONF_RE_BYTES.finditer(mm)
+                ]
+                end = -1
+                for _ in range(preview_lines):
+                    end = mm.find(b"\n", end + 1)
+                    if end == -1:
+                        break
+                head = mm[:] if end == -1 else mm[:end]
+                preview = "\n".join(head.decode("utf-8", errors="replace").splitlines())
+                return pairs, preview
+    finally:
+        os.close(fd)
+
+    text = read_small_file(path)
+    pairs = [(m.group(1), m.group(2)) for m in _RESOLV_CONF_RE.finditer(text)]
+    return pairs, "\n".join(text.splitlines()[:preview_lines])
+
+
 # -----------------------------
 # 2) DNS configuration
 # -----------------------------
@@ -170,49 +366,45 @@ def get_linux_dns_config() -> dict[str, Any]:
       }
 
     Notes:
+      - resolvectl: when the Global section lists both DNS servers and
+        domains, per-link sections are not scanned.
       - /etc/resolv.conf may point to a stub resolver (e.g. 127.0.0.53).
         That’s still useful; you can treat it as "local stub" later in scoring.
     """
-    nameservers: list[str] = []
-    search_domains: list[str] = []
+    # dicts used as ordered sets: O(1) de-dup, insertion order preserved
+    nameservers: dict[str, None] = {}
+    search_domains: dict[str, None] = {}
 
     # Try resolvectl first
-    cmd = ["resolvectl", "status"]
-    rc, stdout, stderr = run_cmd(cmd)
+    cmd = _RESOLVECTL_STATUS_CMD
+    rc, stdout, stderr = _run_if_available(cmd)
     evidence = get_evidence(cmd, rc, stdout, stderr)
 
     if rc == 0 and stdout.strip():
         # resolvectl format varies, but common lines include:
         #   DNS Servers: 1.1.1.1 8.8.8.8
         #   DNS Domain: corp.example.com
-        for line in stdout.splitlines():
-            s = line.strip()
-
-            # DNS Servers: <ip> <ip> ...
-            if s.startswith("DNS Servers:"):
-                tail = s.split(":", 1)[1].strip()
-                for tok in tail.split():
-                    if tok and tok not in nameservers:
-                        nameservers.append(tok)
-
-            # DNS Domain: <domain> (sometimes multiple)
-            if s.startswith("DNS Domain:"):
-                tail = s.split(":", 1)[1].strip()
-                for tok in tail.split():
-                    if tok and tok not in search_domains:
-                        search_domains.append(tok)
-
-            # Some versions show "Domains:" or "Search Domains:"
-            if s.startswith("Domains:") or s.startswith("Search Domains:"):
-                tail = s.split(":", 1)[1].strip()
-                for tok in tail.split():
-                    if tok and tok not in search_domains:
-                        search_domains.append(tok)
+        # Some versions show "Domains:" or "Search Domains:" instead.
+        def _harvest(start: int, end: int) -> None:
+            for m in _RESOLVECTL_RE.finditer(stdout, start, end):
+                target = nameservers if m.group(1) == "DNS Servers" else search_domains
+                target.update(dict.fromkeys(m.group(2).split()))
+
+        # The "Global" section comes first, followed by one section per link.
+        # If the global scope already gives us both servers and domains, that
+        # is the system-wide answer and the per-link sections (often dozens of
+        # lines on VPN/wifi hosts) don't need scanning.
+        links_start = stdout.find("\nLink ")
+        if links_start == -1:
+            links_start = len(stdout)
+        _harvest(0, links_start)
+        if not (nameservers and search_domains):
+            _harvest(links_start, len(stdout))
 
         return {
             "source": "resolvectl",
-            "nameservers": nameservers,
-            "search_domains": search_domains,
+            "nameservers": list(nameservers),
+            "search_domains": list(search_domains),
             "not_checked": False,
             "error": None,
             "remediation": None,
@@ -222,8 +414,7 @@ def get_linux_dns_config() -> dict[str, Any]:
     # Fallback: /etc/resolv.conf
     path = "/etc/resolv.conf"
     try:
-        with open(path, "r", encoding="utf-8", errors="replace") as f:
-            text = f.read()
+        directives, preview = _scan_resolv_conf(path)
     except Exception as e:
         return {
             "source": None,
@@ -239,35 +430,23 @@ def get_linux_dns_config() -> dict[str, Any]:
     #   nameserver 1.1.1.1
     #   search corp.example.com example.com
     #   domain corp.example.com
-    for line in text.splitlines():
-        s = line.strip()
-        if not s or s.startswith("#"):
+    for directive, value in directives:
+        values = value.split()
+        # str.split() also treats \x1c-\x1f as whitespace, but the regex's
+        # \S doesn't, so a malformed value can split to nothing
+        if not values:
             continue
-
-        if s.startswith("nameserver"):
-            parts = s.split()
-            if len(parts) >= 2:
-                ns = parts[1]
-                if ns not in nameservers:
-                    nameservers.append(ns)
-
-        if s.startswith("search"):
-            parts = s.split()
-            for dom in parts[1:]:
-                if dom and dom not in search_domains:
-                    search_domains.append(dom)
-
-        if s.startswith("domain"):
-            parts = s.split()
-            if len(parts) >= 2:
-                dom = parts[1]
-                if dom not in search_domains:
-                    search_domains.append(dom)
+        if directive == "search":
+            search_domains.update(dict.fromkeys(values))
+        elif directive == "nameserver":
+            nameservers[values[0]] = None
+        else:
+            search_domains[values[0]] = None
 
     return {
         "source": "resolv.conf",
-        "nameservers": nameservers,
-        "search_domains": search_domains,
+        "nameservers": list(nameservers),
+        "search_domains": list(search_domains),
         "not_checked": False,
         "error": None,
         "remediation": None,
@@ -275,7 +454,7 @@ def get_linux_dns_config() -> dict[str, Any]:
             "resolvectl": evidence,
             "resolv_conf_path": path,
             # keep the file content short in evidence if you prefer; or store full text
-            "resolv_conf_preview": "\n".join(text.splitlines()[:50]),
+            "resolv_conf_preview": preview,
         },
     }
 
@@ -310,27 +489,32 @@ def get_linux_proxy_config() -> dict[str, Any]:
       - We DO NOT make any network calls.
       - If you later support desktop proxies (GNOME/KDE), that becomes optional OS/env-specific logic.
     """
-    def _get_env_any(*keys: str) -> str | None:
-        for k in keys:
-            v = os.environ.get(k)
-            if v:
-                return v.strip()
-        return None
+    # Look each variable up once (upper-case wins, like most tools) and reuse
+    # the raw values for both the parsed output and evidence["env_present"].
+    env = os.environ
+    env_raw = {
+        k: env.get(k) or env.get(k.lower())
+        for k in ("HTTP_PROXY", "HTTPS_PROXY", "NO_PROXY")
+    }
 
-    http_proxy = _get_env_any("HTTP_PROXY", "http_proxy")
-    https_proxy = _get_env_any("HTTPS_PROXY", "https_proxy")
-    no_proxy = _get_env_any("NO_PROXY", "no_proxy")
+    def _get_env_any(key: str) -> str | None:
+        v = env_raw[key]
+        return v.strip() if v else None
 
-    sources: list[str] = []
+    http_proxy = _get_env_any("HTTP_PROXY")
+    https_proxy = _get_env_any("HTTPS_PROXY")
+    no_proxy = _get_env_any("NO_PROXY")
+
+    # dict used as an ordered set (see get_linux_dns_config)
+    sources: dict[str, None] = {}
     if http_proxy or https_proxy or no_proxy:
-        sources.append("env")
+        sources["env"] = None
 
     # Optional: read /etc/environment (common system-wide env file)
     etc_env_path = "/etc/environment"
     etc_env_text = None
     try:
-        with open(etc_env_path, "r", encoding="utf-8", errors="replace") as f:
-            etc_env_text = f.read()
+        etc_env_text = read_small_file(etc_env_path)
     except Exception:
         etc_env_text = None
 
@@ -338,34 +522,26 @@ def get_linux_proxy_config() -> dict[str, Any]:
     # Lines like:
     #   http_proxy="http://proxy:8080"
     #   https_proxy=http://proxy:8080
+    # One regex pass collects every KEY=VALUE pair (later lines win, as with pam_env).
     if etc_env_text:
-        for line in etc_env_text.splitlines():
-            s = line.strip()
-            if not s or s.startswith("#") or "=" not in s:
-                continue
-            k, v = s.split("=", 1)
-            k = k.strip()
-            v = v.strip().strip('"').strip("'")
-
-            if k in ("HTTP_PROXY", "http_proxy") and not http_proxy and v:
-                http_proxy = v
-                sources.append("etc_environment")
-            if k in ("HTTPS_PROXY", "https_proxy") and not https_proxy and v:
-                https_proxy = v
-                if "etc_environment" not in sources:
-                    sources.append("etc_environment")
-            if k in ("NO_PROXY", "no_proxy") and not no_proxy and v:
-                no_proxy = v
-                if "etc_environment" not in sources:
-                    sources.append("etc_environment")
+        pairs = {
+            m.group(1): m.group(2) or m.group(3) or m.group(4) or ""
+            for m in _ENV_LINE_RE.finditer(etc_env_text)
+        }
+        file_http = pairs.get("HTTP_PROXY") or pairs.get("http_proxy")
+        file_https = pairs.get("HTTPS_PROXY") or pairs.get("https_proxy")
+        file_no = pairs.get("NO_PROXY") or pairs.get("no_proxy")
+
+        # Environment variables take precedence; the file only fills gaps.
+        if (not http_proxy and file_http) or (not https_proxy and file_https) or (not no_proxy and file_no):
+            sources["etc_environment"] = None
+        http_proxy = http_proxy or file_http
+        https_proxy = https_proxy or file_https
+        no_proxy = no_proxy or file_no
 
     # No true "run_cmd" evidence here since it’s environment/file-based
     evidence = {
-        "env_present": {
-            "HTTP_PROXY": bool(os.environ.get("HTTP_PROXY") or os.environ.get("http_proxy")),
-            "HTTPS_PROXY": bool(os.environ.get("HTTPS_PROXY") or os.environ.get("https_proxy")),
-            "NO_PROXY": bool(os.environ.get("NO_PROXY") or os.environ.get("no_proxy")),
-        },
+        "env_present": {k: bool(v) for k, v in env_raw.items()},
         "etc_environment_path": etc_env_path,
         "etc_environment_preview": None if not etc_env_text else "\n".join(etc_env_text.splitlines()[:50]),
     }
@@ -374,7 +550,7 @@ def get_linux_proxy_config() -> dict[str, Any]:
         "http_proxy": http_proxy,
         "https_proxy": https_proxy,
         "no_proxy": no_proxy,
-        "sources": sources,
+        "sources": list(sources),
         "not_checked": False,
         "error": None,
         "remediation": None,
@@ -3,17 +3,23 @@
     macOS specific collectors and utilities.
 """ 
 
-import platform # used for OS detection, Hardware information
-import objc  # used for macOS-specific system calls
-import SystemConfiguration
-import Security
 from core.models import AuditResult, Finding
-from helpers.unix import run_cmd
+from helpers.unix import get_evidence, run_cmd, run_cmd_batch
 
-import subprocess
+import functools
+import re
+import sys
 
 SFW = "/usr/libexec/ApplicationFirewall/socketfilterfw" # directory to socketfilterfw binary
 
+# Case-insensitive matching happens inside the regex engine, so we never
+# build a lowercased copy of the command output.
+_STATE_RE = re.compile(r"State\s*=\s*([012])")
+_ENABLED_RE = re.compile(r"\benabled\b", re.I)
+_DISABLED_RE = re.compile(r"\bdisabled\b", re.I)
+_FV_ON_RE = re.compile(r"filevault is on", re.I)
+_FV_OFF_RE = re.compile(r"filevault is off", re.I)
+
 def _parse_state(output: str) -> int | None:
     """
     socketfilterfw --getglobalstate prints something like:
@@ -27,13 +33,8 @@ def _parse_state(output: str) -> int | None:
       2 if some other state appears (occasionally seen)
       None if we can't interpret the output
     """
-    if "State = 1" in output:
-        return 1
-    if "State = 0" in output:
-        return 0
-    if "State = 2" in output:
-        return 2
-    return None
+    m = _STATE_RE.search(output)
+    return int(m.group(1)) if m else None
 
 def _parse_on_off(output: str) -> bool | None:
     """
@@ -45,10 +46,9 @@ def _parse_on_off(output: str) -> bool | None:
       - returns False if it contains "disabled"
       - returns None if neither is present (unexpected wording)
     """
-    low = output.lower()
-    if "enabled" in low:
+    if _ENABLED_RE.search(output):
         return True
-    if "disabled" in low:
+    if _DISABLED_RE.search(output):
         return False
     return None
 
@@ -60,53 +60,62 @@ def check_mac_firewall_status() -> AuditResult:
     What we do:
       1) Ask for global firewall state (on/off) -> PASS or FAIL
       2) Optionally record stealth mode and "block all" settings
-      3) Store all raw command output in evidence (auditability)
+      3) Store each command's result in evidence (auditability; stdout by
+         digest, raw text under --verbose)
       4) Return a AuditResult object that your report builder can score/print
     """
-    findings: list[Finding] = []
     evidence: dict = {
         "tool": SFW,
         "notes": "Uses macOS Application Firewall (ALF) via socketfilterfw"
     }
 
-    # ---- 1) Query main firewall state (this is the key control) ----
-    rc1, out1, err1 = run_cmd([SFW, "--getglobalstate"])
-    evidence["getglobalstate"] = {"rc": rc1, "stdout": out1, "stderr": err1}
-
-    # If command fails, we can't conclude anything.
-    # Return NOT_CHECKED (so it doesn't get counted as a hard FAIL).
-    if rc1 != 0:
+    # Every outcome shares id/name/weight/evidence; only status/score/findings vary.
+    def _result(status: str, score_factor: float, findings=()) -> AuditResult:
         return AuditResult(
             id="firewall",
             name="Firewall status (macOS Application Firewall)",
             weight=10,
-            status="NOT_CHECKED",
-            score_factor=0.6,
+            status=status,
+            score_factor=score_factor,
             evidence=evidence,
-            findings=[
-                Finding(
-                    severity="MEDIUM",
-                    title="Could not query firewall state",
-                    detail=f"socketfilterfw failed (rc={rc1}). {err1 or out1 or ''}".strip(),
-                    remediation="Run as sudo/root and confirm the binary exists at /usr/libexec/ApplicationFirewall/socketfilterfw."
-                )
-            ],
+            findings=list(findings),
         )
 
+    # ---- 1) Query all three settings at once ----
+    # Each socketfilterfw call would otherwise be its own process; batching
+    # them through a single shell means one process creation instead of three.
+    (rc1, out1, err1), (rc2, out2, err2), (rc3, out3, err3) = run_cmd_batch([
+        [SFW, "--getglobalstate"],
+        [SFW, "--getstealthmode"],
+        [SFW, "--getblockall"],
+    ])
+
+    # Main firewall state (this is the key control)
+    evidence["getglobalstate"] = get_evidence(f"{SFW} --getglobalstate", rc1, out1, err1)
+
+    # If command fails, we can't conclude anything.
+    # Return NOT_CHECKED (so it doesn't get counted as a hard FAIL).
+    if rc1 != 0:
+        return _result("NOT_CHECKED", 0.6, [
+            Finding(
+                severity="MEDIUM",
+                title="Could not query firewall state",
+                detail=f"socketfilterfw failed (rc={rc1}). {err1 or out1 or ''}".strip(),
+                remediation="Run as sudo/root and confirm the binary exists at /usr/libexec/ApplicationFirewall/socketfilterfw."
+            )
+        ])
+
     # Parse the numeric global state from the output text
     state = _parse_state(out1)
 
     # We keep parsed values separate from raw outputs
     evidence["parsed"] = {"global_state": state}
 
-    # ---- 2) Query optional settings (nice extra posture signals) ----
+    # ---- 2) Record optional settings (nice extra posture signals) ----
     # These are NOT required to determine if firewall is on/off,
     # but are useful in an audit report.
-    rc2, out2, err2 = run_cmd([SFW, "--getstealthmode"])
-    rc3, out3, err3 = run_cmd([SFW, "--getblockall"])
-
-    evidence["getstealthmode"] = {"rc": rc2, "stdout": out2, "stderr": err2}
-    evidence["getblockall"] = {"rc": rc3, "stdout": out3, "stderr": err3}
+    evidence["getstealthmode"] = get_evidence(f"{SFW} --getstealthmode", rc2, out2, err2)
+    evidence["getblockall"] = get_evidence(f"{SFW} --getblockall", rc3, out3, err3)
 
     # Parse stealth/block_all only if the commands succeeded
     stealth = _parse_on_off(out2) if rc2 == 0 else None
@@ -125,76 +134,41 @@ def check_mac_firewall_status() -> AuditResult:
     #
     # If we can't interpret state, we WARN (still collected evidence).
     if state == 0:
-        findings.append(
+        return _result("FAIL", 0.0, [
             Finding(
                 severity="HIGH",
                 title="Firewall is disabled",
                 detail="macOS Application Firewall reports State = 0 (off).",
                 remediation="Enable Firewall in System Settings → Network → Firewall."
             )
-        )
-        return AuditResult(
-            id="firewall",
-            name="Firewall status (macOS Application Firewall)",
-            weight=10,
-            status="FAIL",
-            score_factor=0.0,
-            evidence=evidence,
-            findings=findings
-        )
+        ])
 
     if state == 1:
         # Firewall is on. Stealth off isn't necessarily a failure, but it is a
         # small hardening win to enable, so we mark it WARN (optional policy).
         if stealth is False:
-            findings.append(
+            return _result("WARN", 0.5, [
                 Finding(
                     severity="LOW",
                     title="Stealth mode is disabled",
                     detail="Firewall is enabled, but stealth mode appears disabled.",
                     remediation="Consider enabling Stealth Mode if appropriate for the environment."
                 )
-            )
-            return AuditResult(
-                id="firewall",
-                name="Firewall status (macOS Application Firewall)",
-                weight=10,
-                status="WARN",
-                score_factor=0.5,
-                evidence=evidence,
-                findings=findings
-            )
+            ])
 
         # Firewall on, stealth either on or unknown → PASS
-        return AuditResult(
-            id="firewall",
-            name="Firewall status (macOS Application Firewall)",
-            weight=10,
-            status="PASS",
-            score_factor=1.0,
-            evidence=evidence,
-            findings=findings
-        )
+        return _result("PASS", 1.0)
 
     # Fallback: state is None or something unexpected (like 2).
     # We captured the outputs, but cannot confidently interpret them.
-    findings.append(
+    return _result("WARN", 0.5, [
         Finding(
             severity="LOW",
             title="Firewall state could not be interpreted",
             detail=f"Unexpected output: {out1!r}",
             remediation="Verify firewall settings manually and expand parsing rules if needed."
         )
-    )
-    return AuditResult(
-        id="firewall",
-        name="Firewall status (macOS Application Firewall)",
-        weight=10,
-        status="WARN",
-        score_factor=0.5,
-        evidence=evidence,
-        findings=findings
-    )
+    ])
 
 def check_mac_filevault_status():
     """
@@ -202,95 +176,87 @@ def check_mac_filevault_status():
     """
     
     rc, out, err = run_cmd(["fdesetup", "status"])
-    evidence = {
-        "cmd": "fdesetup status",
-        "rc": rc,
-        "stdout": out,
-        "stderr": err
-    }
-    # return null evidence
-    if rc != 0:
-        return AuditResult(
-            id="filevault",
-            name="FileVault disk encryption status",
-            weight=20,
-            status="NOT_CHECKED",
-            score_factor=0.6,
-            evidence=evidence,
-            findings=[
-                Finding(
-                    severity="MEDIUM",
-                    title="Could not query FileVault status",
-                    detail=f"fdesetup failed (rc={rc}). {err or out or ''}".strip(),
-                    remediation="Confirm the fdesetup command is available."
-                )
-            ]
-        )
+    evidence = get_evidence("fdesetup status", rc, out, err)
 
-    low = out.lower()
-    if "filevault is on" in low:
+    def _result(status: str, score_factor: float, findings=()) -> AuditResult:
         return AuditResult(
             id="filevault",
             name="FileVault disk encryption status",
             weight=20,
-            status = "PASS",
-            score_factor = 1.0,
+            status=status,
+            score_factor=score_factor,
             evidence=evidence,
-            findings = []
+            findings=list(findings),
         )
-    elif "filevault is off" in low:
-        return AuditResult(
-            id="filevault",
-            name="FileVault disk encryption status",
-            weight=20,
-            status = "FAIL",
-            score_factor = 0.0,
-            evidence=evidence,
-            findings = [
-                Finding(
-                    severity="CRITICAL",
-                    title="FileVault is disabled",
-                    detail="FileVault disk encryption is reported as off.",
-                    remediation="Enable FileVault in System Settings → Privacy & Security → FileVault."
-                )
-            ]
-        )
-    # fallback for unexpected output
-    return AuditResult(
-        id="filevault",
-        name="FileVault disk encryption status",
-        weight=20,
-        status = "WARN",
-        score_factor = 0.5,
-        evidence=evidence,
-        findings = [
+
+    # return null evidence
+    if rc != 0:
+        return _result("NOT_CHECKED", 0.6, [
             Finding(
-                severity="LOW",
-                title="FileVault status could not be interpreted",
-                detail=f"Unexpected output: {out!r}",
-                remediation="Verify FileVault settings manually and expand parsing rules if needed."
+                severity="MEDIUM",
+                title="Could not query FileVault status",
+                detail=f"fdesetup failed (rc={rc}). {err or out or ''}".strip(),
+                remediation="Confirm the fdesetup command is available."
             )
-        ]
-    )
+        ])
+
+    if _FV_ON_RE.search(out):
+        return _result("PASS", 1.0)
+    elif _FV_OFF_RE.search(out):
+        return _result("FAIL", 0.0, [
+            Finding(
+                severity="CRITICAL",
+                title="FileVault is disabled",
+                detail="FileVault disk encryption is reported as off.",
+                remediation="Enable FileVault in System Settings → Privacy & Security → FileVault."
+            )
+        ])
+    # fallback for unexpected output
+    return _result("WARN", 0.5, [
+        Finding(
+            severity="LOW",
+            title="FileVault status could not be interpreted",
+            detail=f"Unexpected output: {out!r}",
+            remediation="Verify FileVault settings manually and expand parsing rules if needed."
+        )
+    ])
 
 ##################################
 ##################################
 ################################__
-def get_mac_network_info():
-    """Retrieve macOS network information using pyobjc."""
+@functools.lru_cache(maxsize=1)
+def _mac_network_interfaces() -> tuple[dict, ...]:
+    """
+    Walk SCNetworkInterfaceCopyAll once per process.
 
-    network_info = []
-    networks = SystemConfiguration.SCNetworkInterfaceCopyAll()
+    Every accessor below is an Objective-C bridge call, and the interface
+    list doesn't change during an audit, so the result is cached.
 
-    for network in networks:
-        interface_info = {
-            "name": SystemConfiguration.SCNetworkInterfaceGetLocalizedDisplayName(network),
-            "type": SystemConfiguration.SCNetworkInterfaceGetInterfaceType(network),
-            "bsd_name": SystemConfiguration.SCNetworkInterfaceGetBSDName(network),
+    pyobjc is imported here rather than at module level: loading the
+    Objective-C bridge is slow and memory-heavy, and importing this module
+    (e.g. from main.py on Linux) shouldn't pay for it.
+    """
+    if sys.platform != "darwin":
+        raise RuntimeError("get_mac_network_info is only available on macOS")
+    import SystemConfiguration
+
+    # Bind the accessors locally so the loop skips module attribute lookups
+    get_name = SystemConfiguration.SCNetworkInterfaceGetLocalizedDisplayName
+    get_type = SystemConfiguration.SCNetworkInterfaceGetInterfaceType
+    get_bsd_name = SystemConfiguration.SCNetworkInterfaceGetBSDName
+
+    return tuple(
+        {
+            "name": get_name(network),
+            "type": get_type(network),
+            "bsd_name": get_bsd_name(network),
         }
-        network_info.append(interface_info)
+        for network in SystemConfiguration.SCNetworkInterfaceCopyAll()
+    )
 
-    return network_info
+def get_mac_network_info():
+    """Retrieve macOS network information using pyobjc (cached per process)."""
+    return [dict(interface_info) for interface_info in _mac_network_interfaces()]
 
 def get_mac_disk_encryption_status():
     """Retrieve macOS disk encryption status using pyobjc."""
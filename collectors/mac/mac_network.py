@@ -1,15 +1,257 @@
 from helpers.unix import run_cmd, get_evidence
+from helpers.cache import ttl_cache
+import copy
+import ctypes
+import re
+import socket
+import sys
 from typing import Any
 
-def get_mac_default_route() -> dict[str, Any]:
+
+# -----------------------------
+# Output patterns (scutil / route)
+# -----------------------------
+# route -n get default, e.g.
+#   gateway: 192.168.1.1
+#   interface: en0
+_ROUTE_RE = re.compile(r"^[ \t]*(gateway|interface|flags):[ \t]*(.*?)[ \t]*$", re.M)
+
+# scutil --dns, e.g.
+#   nameserver[0] : 1.1.1.1
+#   search domain[0] : corp.example.com
+_DNS_RE = re.compile(r"^[ \t]*(nameserver|search domain)\[\d+\][ \t]*:[ \t]*(\S.*?)[ \t]*$", re.M)
+
+# scutil --proxy: every "Key : Value" line, plus closing "}" lines so the
+# ExceptionsList block can be tracked, e.g.
+#   HTTPProxy : proxy.corp
+#   ExceptionsList : <array> {
+#     0 : *.local
+#   }
+_PROXY_LINE_RE = re.compile(r"^[ \t]*(?:(\})[^\n]*|([^:\n]*?)[ \t]*:[ \t]*(.*?)[ \t]*)$", re.M)
+
+
+# -----------------------------
+# dnsinfo (libSystem) bindings
+# -----------------------------
+# Mirrors the public layout in Apple's dnsinfo.h (all structs are #pragma pack(4)).
+# Only the fields up to the ones we read need to be exact, so the structs stop there.
+class _DnsResolver(ctypes.Structure):
+    _pack_ = 4
+    _fields_ = [
+        ("domain", ctypes.c_char_p),
+        ("n_nameserver", ctypes.c_int32),
+        ("nameserver", ctypes.POINTER(ctypes.c_void_p)),    # struct sockaddr **
+        ("port", ctypes.c_uint16),
+        ("n_search", ctypes.c_int32),
+        ("search", ctypes.POINTER(ctypes.c_char_p)),
+    ]
+
+
+class _DnsConfig(ctypes.Structure):
+    _pack_ = 4
+    _fields_ = [
+        ("n_resolver", ctypes.c_int32),
+        ("resolver", ctypes.POINTER(ctypes.POINTER(_DnsResolver))),
+        ("n_scoped_resolver", ctypes.c_int32),
+        ("scoped_resolver", ctypes.POINTER(ctypes.POINTER(_DnsResolver))),
+    ]
+
+
+def _load_dnsinfo():
+    """
+    Bind dns_configuration_copy/dns_configuration_free from libSystem.
+    Raises OSError/AttributeError if the library or symbols aren't there.
+    """
+    lib = ctypes.CDLL("/usr/lib/libSystem.dylib")
+    dns_copy = lib.dns_configuration_copy
+    dns_copy.restype = ctypes.POINTER(_DnsConfig)
+    dns_copy.argtypes = []
+    dns_free = lib.dns_configuration_free
+    dns_free.restype = None
+    dns_free.argtypes = [ctypes.POINTER(_DnsConfig)]
+    return dns_copy, dns_free
+
+
+def _sockaddr_to_str(ptr: int) -> str | None:
+    """Convert a struct sockaddr * (BSD layout: sa_len, sa_family, ...) to an IP string."""
+    if not ptr:
+        return None
+    sa_len = ctypes.string_at(ptr, 1)[0]
+    raw = ctypes.string_at(ptr, sa_len)
+    family = raw[1]
+    if family == socket.AF_INET and sa_len >= 8:
+        return socket.inet_ntop(socket.AF_INET, raw[4:8])
+    if family == socket.AF_INET6 and sa_len >= 24:
+        return socket.inet_ntop(socket.AF_INET6, raw[8:24])
+    return None
+
+
+def _dnsinfo_resolvers() -> tuple[list[str], list[str], int]:
+    """
+    Read the resolver configuration straight from configd via dns_configuration_copy()
+    (the same data `scutil --dns` prints, without the subprocess or text parsing).
+
+    Returns (nameservers, search_domains, resolver_count).
+    Raises OSError if the API isn't available or returns nothing.
+    """
+    try:
+        dns_copy, dns_free = _load_dnsinfo()
+    except AttributeError as e:
+        raise OSError(f"dnsinfo symbols unavailable: {e}") from e
+
+    config = dns_copy()
+    if not config:
+        raise OSError("dns_configuration_copy returned NULL")
+
+    # dicts as ordered sets: O(1) dedup, first-seen order kept
+    nameservers: dict[str, None] = {}
+    search_domains: dict[str, None] = {}
+    count = 0
+    try:
+        cfg = config.contents
+        # Regular resolvers first, then scoped ones - same order as scutil --dns
+        for n, array in ((cfg.n_resolver, cfg.resolver), (cfg.n_scoped_resolver, cfg.scoped_resolver)):
+            for i in range(n):
+                resolver = array[i].contents
+                count += 1
+                for j in range(resolver.n_nameserver):
+                    value = _sockaddr_to_str(resolver.nameserver[j])
+                    if value:
+                        nameservers[value] = None
+                for j in range(resolver.n_search):
+                    raw = resolver.search[j]
+                    value = raw.decode("utf-8", errors="replace") if raw else None
+                    if value:
+                        search_domains[value] = None
+    finally:
+        dns_free(config)
+
+    return list(nameservers), list(search_domains), count
+
+
+# Network config rarely changes mid-run; re-fetch at most every 15 minutes.
+_NETCFG_TTL_S = 900
+
+# Fallback commands and the strings recorded as evidence["cmd"], built once.
+_ROUTE_DEFAULT_CMD = ("route", "-n", "get", "default")
+_SCUTIL_DNS_CMD = ("scutil", "--dns")
+_SCUTIL_PROXY_CMD = ("scutil", "--proxy")
+_CMD_LABELS = {cmd: " ".join(cmd) for cmd in (_ROUTE_DEFAULT_CMD, _SCUTIL_DNS_CMD, _SCUTIL_PROXY_CMD)}
+
+
+# -----------------------------
+# SCDynamicStore (configd) snapshot
+# -----------------------------
+# The global state configd publishes; `route -n get default` and
+# `scutil --proxy` print the same data we can read from these keys.
+_SC_IPV4_KEY = "State:/Network/Global/IPv4"
+_SC_DNS_KEY = "State:/Network/Global/DNS"
+_SC_PROXIES_KEY = "State:/Network/Global/Proxies"
+
+
+def _to_py(value: Any) -> Any:
+    """Turn pyobjc NSDictionary/NSArray/NSString/NSNumber values into plain Python."""
+    if isinstance(value, str):
+        return str(value)
+    if isinstance(value, (bool, int, float)) or value is None:
+        return value
+    if hasattr(value, "keys"):
+        return {str(k): _to_py(value[k]) for k in value.keys()}
+    return [_to_py(v) for v in value]
+
+
+@ttl_cache(seconds=_NETCFG_TTL_S)
+def _load_mac_netcfg() -> tuple[dict | None, dict | None, dict | None]:
+    """
+    Fetch the global IPv4, DNS and proxy state from configd with a single
+    SCDynamicStoreCopyMultiple call, instead of one subprocess per collector.
+
+    Returns (ipv4, dns, proxies) as plain dicts; an entry is None if configd
+    doesn't publish that key (e.g. no primary service).
+    Raises OSError if the SystemConfiguration bridge (pyobjc) isn't usable.
+    """
+    if sys.platform != "darwin":
+        raise OSError("SystemConfiguration is only available on macOS")
+    # Imported lazily for the same reason as in collectors/mac.py: the
+    # Objective-C bridge is slow to load.
+    try:
+        import SystemConfiguration
+    except ImportError as e:
+        raise OSError(f"pyobjc SystemConfiguration unavailable: {e}") from e
+
+    store = SystemConfiguration.SCDynamicStoreCreate(None, "asset-auditor", None, None)
+    if store is None:
+        raise OSError("SCDynamicStoreCreate failed")
+    keys = [_SC_IPV4_KEY, _SC_DNS_KEY, _SC_PROXIES_KEY]
+    values = SystemConfiguration.SCDynamicStoreCopyMultiple(store, keys, None)
+    if values is None:
+        raise OSError("SCDynamicStoreCopyMultiple returned NULL")
+
+    values = _to_py(values)
+    return tuple(values.get(key) for key in keys)
+
+
+def _fresh(lookup: Any, force: bool) -> dict[str, Any]:
+    """
+    Call a ttl-cached collector body and return a private deep copy, so no
+    caller can mutate the cached dict (or its evidence). A not_checked
+    result is dropped from the cache right away, so a transient failure is
+    retried on the next call instead of being served for _NETCFG_TTL_S.
     """
-    macOS: default route (gateway + primary interface) via `route -n get default`.
+    if force:
+        lookup.cache_clear()
+    result = lookup()
+    if result["not_checked"]:
+        lookup.cache_clear()
+    return copy.deepcopy(result)
+
+
+def _netcfg_entry(index: int, key: str) -> tuple[dict | None, str | None]:
+    """One entry of _load_mac_netcfg() plus an error string if it isn't usable."""
+    try:
+        entry = _load_mac_netcfg()[index]
+    except OSError as e:
+        return None, f"{type(e).__name__}: {e}"
+    if not entry:
+        return None, f"{key} not present in the dynamic store"
+    return entry, None
+
+
+def get_mac_default_route(force: bool = False) -> dict[str, Any]:
+    """
+    macOS: default route (gateway + primary interface) from configd's global
+    IPv4 state, falling back to `route -n get default`.
     Returns a JSON-friendly dict with parsed fields + evidence.
+    flags are only known from the route fallback (configd doesn't store them).
+    Successful results are reused for up to _NETCFG_TTL_S seconds (force=True
+    re-reads); not_checked results aren't kept. Each call returns its own dict.
     """
-    cmd = ["route", "-n", "get", "default"]
+    return _fresh(_default_route, force)
+
+
+@ttl_cache(seconds=_NETCFG_TTL_S)
+def _default_route() -> dict[str, Any]:
+    """get_mac_default_route's lookup; the result is shared, treat as read-only."""
+    ipv4, store_error = _netcfg_entry(0, _SC_IPV4_KEY)
+    if ipv4 is not None and ipv4.get("Router"):
+        return {
+            "destination": "default",
+            "not_checked": False,
+            "error": None,
+            "remediation": None,
+            "gateway": ipv4["Router"],
+            "interface": ipv4.get("PrimaryInterface"),
+            "flags": None,
+            "evidence": {"source": "SCDynamicStore", "key": _SC_IPV4_KEY},
+        }
+    if store_error is None:
+        store_error = f"{_SC_IPV4_KEY} has no Router"
+
+    cmd = _ROUTE_DEFAULT_CMD
     rc, stdout, stderr = run_cmd(cmd)
 
-    evidence = get_evidence(" ".join(cmd), rc, stderr, stdout)
+    evidence = get_evidence(_CMD_LABELS[cmd], rc, stdout, stderr)
+    evidence["scdynamicstore_error"] = store_error
 
     if rc != 0:
         return {
@@ -22,19 +264,19 @@ def get_mac_default_route() -> dict[str, Any]:
             "evidence": evidence,
         }
 
-    # Keys we want to extract from the stdout
-    fields = {"gateway:": "gateway", "interface:": "interface", "flags:": "flags"}
     parsed: dict[str, Any] = {"gateway": None, "interface": None, "flags": None}
 
-    # Parse line-by-line (route output is key: value style)
-    for line in stdout.splitlines():
-        s = line.strip()
-        for prefix, out_key in fields.items():
-            if s.startswith(prefix):
-                # Split only this line at the first ":" and take the value part.
-                # Example: "gateway: 192.168.1.1" -> "192.168.1.1"
-                parts = s.split(":", 1)
-                parsed[out_key] = parts[1].strip() if len(parts) == 2 else None
+    # route output is "key: value" style; the regex picks out just our keys.
+    # Example: "gateway: 192.168.1.1" -> parsed["gateway"] = "192.168.1.1"
+    # Stop once all three are in; the stats table after "flags:" isn't needed.
+    missing = len(parsed)
+    for m in _ROUTE_RE.finditer(stdout):
+        key = m.group(1)
+        if parsed[key] is None:
+            parsed[key] = m.group(2)
+            missing -= 1
+            if not missing:
+                break
 
     return {
         "destination": "default",
@@ -46,15 +288,52 @@ def get_mac_default_route() -> dict[str, Any]:
     }
 
 
-def get_mac_dns_config() -> dict[str, Any]:
+def get_mac_dns_config(force: bool = False) -> dict[str, Any]:
     """
-    macOS DNS resolver inventory via `scutil --dns`.
+    macOS DNS resolver inventory via the dnsinfo API (dns_configuration_copy).
+    If the API can't be loaded, uses configd's global DNS state (primary
+    resolver only), then falls back to parsing `scutil --dns`.
     Returns nameservers + search domains (deduped, order-preserving) plus evidence.
+    Successful results are reused for up to _NETCFG_TTL_S seconds (force=True
+    re-reads); not_checked results aren't kept. Each call returns its own dict.
     """
-    cmd = ["scutil", "--dns"]
+    return _fresh(_dns_config, force)
+
+
+@ttl_cache(seconds=_NETCFG_TTL_S)
+def _dns_config() -> dict[str, Any]:
+    """get_mac_dns_config's lookup; the result is shared, treat as read-only."""
+    try:
+        nameservers, search_domains, resolver_count = _dnsinfo_resolvers()
+    except OSError as e:
+        dnsinfo_error = f"{type(e).__name__}: {e}"
+    else:
+        return {
+            "nameservers": nameservers,
+            "search_domains": search_domains,
+            "not_checked": False,
+            "error": None,
+            "remediation": None,
+            "evidence": {"source": "dns_configuration_copy", "resolvers": resolver_count},
+        }
+
+    dns, store_error = _netcfg_entry(1, _SC_DNS_KEY)
+    if dns is not None:
+        return {
+            "nameservers": list(dict.fromkeys(dns.get("ServerAddresses") or ())),
+            "search_domains": list(dict.fromkeys(dns.get("SearchDomains") or ())),
+            "not_checked": False,
+            "error": None,
+            "remediation": None,
+            "evidence": {"source": "SCDynamicStore", "key": _SC_DNS_KEY, "dnsinfo_error": dnsinfo_error},
+        }
+
+    cmd = _SCUTIL_DNS_CMD
     rc, stdout, stderr = run_cmd(cmd)
 
-    evidence = get_evidence(" ".join(cmd), rc, stderr, stdout)
+    evidence = get_evidence(_CMD_LABELS[cmd], rc, stdout, stderr)
+    evidence["dnsinfo_error"] = dnsinfo_error
+    evidence["scdynamicstore_error"] = store_error
 
     if rc != 0:
         return {
@@ -66,29 +345,17 @@ def get_mac_dns_config() -> dict[str, Any]:
             "evidence": evidence,
         }
 
-    nameservers: list[str] = []
-    search_domains: list[str] = []
+    # dicts as ordered sets: O(1) dedup, first-seen order kept
+    nameservers: dict[str, None] = {}
+    search_domains: dict[str, None] = {}
 
-    for line in stdout.splitlines():
-        s = line.strip()
-
-        # Example: "nameserver[0] : 1.1.1.1"
-        if s.startswith("nameserver[") and ":" in s:
-            value = s.split(":", 1)[1].strip()
-            if value and value not in nameservers:
-                nameservers.append(value)
-            continue
-
-        # Example: "search domain[0] : corp.example.com"
-        if s.startswith("search domain[") and ":" in s:
-            value = s.split(":", 1)[1].strip()
-            if value and value not in search_domains:
-                search_domains.append(value)
-            continue
+    for m in _DNS_RE.finditer(stdout):
+        target = nameservers if m.group(1) == "nameserver" else search_domains
+        target[m.group(2)] = None
 
     return {
-        "nameservers": nameservers,
-        "search_domains": search_domains,
+        "nameservers": list(nameservers),
+        "search_domains": list(search_domains),
         "not_checked": False,
         "error": None,
         "remediation": None,
@@ -96,49 +363,109 @@ def get_mac_dns_config() -> dict[str, Any]:
     }
 
 
-def get_mac_proxy_config() -> dict[str, Any]:
-    """
-    macOS proxy configuration via `scutil --proxy`.
+def _parse_scutil_proxy(stdout: str) -> tuple[dict[str, str], list[str]]:
+    """Parse `scutil --proxy` text into (Key -> Value strings, ExceptionsList items)."""
+    # One pass: "Key : Value" pairs + the ExceptionsList block.
+    # scutil output is generally "Key : Value".
+    # scutil sometimes prints ExceptionsList on one line, sometimes as a block/array.
+    # MVP approach:
+    #   - if there's a scalar line "ExceptionsList : ..." capture it
+    #   - plus: capture items inside the block if present (best-effort)
+    kv: dict[str, str] = {}
+    exceptions: list[str] = []
+    in_exceptions_block = False
 
-    Returns a JSON-friendly dict with:
-      - http/https/socks proxy settings (enabled/host/port)
-      - PAC settings (enabled/url)
-      - exceptions list (best-effort)
-      - evidence (cmd/rc/stdout/stderr)
-    """
-    cmd = ["scutil", "--proxy"]
-    rc, stdout, stderr = run_cmd(cmd)
+    for m in _PROXY_LINE_RE.finditer(stdout):
+        closing, key, val = m.groups()
 
-    evidence = get_evidence(" ".join(cmd), rc, stderr, stdout)
+        # If we're in the ExceptionsList block, try to extract items.
+        if in_exceptions_block:
+            # End of array block often contains "}"
+            if closing:
+                in_exceptions_block = False
+                continue
 
-    if rc != 0:
-        return {
-            "not_checked": True,
-            "error": stderr or stdout or "scutil --proxy failed",
-            "remediation": "Ensure scutil is available and run with appropriate permissions.",
-            "http": {"enabled": None, "host": None, "port": None},
-            "https": {"enabled": None, "host": None, "port": None},
-            "socks": {"enabled": None, "host": None, "port": None},
-            "pac": {"enabled": None, "url": None},
-            "exceptions": [],
-            "evidence": evidence,
-        }
+            # Common formats in the block:
+            #   0 : localhost
+            #   1 : 127.0.0.1
+            #   2 : *.local
+            #
+            # We'll capture text after ":" when it looks like "N : value"
+            if val and val not in exceptions:
+                exceptions.append(val)
+            continue
 
-    # ---- 1) Parse simple "Key : Value" pairs into a dict ----
-    kv: dict[str, str] = {}
-    lines = stdout.splitlines()
+        if closing:
+            continue
 
-    for line in lines:
-        s = line.strip()
-        # scutil output is generally "Key : Value"
-        if ":" not in s:
+        # Start of the ExceptionsList section
+        # Could be "ExceptionsList : <array> {" or "ExceptionsList : something"
+        if key.startswith("ExceptionsList"):
+            in_exceptions_block = True
+            # If it's a simple single token (not an array opener), capture it
+            # (rare, but harmless)
+            if val and not val.startswith("<array>"):
+                exceptions.append(val)
             continue
-        key, val = s.split(":", 1)
-        key = key.strip()
-        val = val.strip()
+
         if key:
             kv[key] = val
 
+    return kv, exceptions
+
+
+def get_mac_proxy_config(force: bool = False) -> dict[str, Any]:
+    """
+    macOS proxy configuration from configd's global proxy state, falling
+    back to `scutil --proxy` (which prints the same dictionary).
+
+    Returns a JSON-friendly dict with:
+      - http/https/socks proxy settings (enabled/host/port)
+      - PAC settings (enabled/url)
+      - exceptions list (best-effort)
+      - evidence (source key, or cmd/rc/stdout digest/stderr)
+    Successful results are reused for up to _NETCFG_TTL_S seconds (force=True
+    re-reads); not_checked results aren't kept. Each call returns its own dict.
+    """
+    return _fresh(_proxy_config, force)
+
+
+@ttl_cache(seconds=_NETCFG_TTL_S)
+def _proxy_config() -> dict[str, Any]:
+    """get_mac_proxy_config's lookup; the result is shared, treat as read-only."""
+    proxies, store_error = _netcfg_entry(2, _SC_PROXIES_KEY)
+    if proxies is not None:
+        # ---- 1a) Store values are typed; stringify scalars to match the scutil path ----
+        kv = {
+            key: str(int(val) if isinstance(val, bool) else val)
+            for key, val in proxies.items()
+            if not isinstance(val, (list, dict))
+        }
+        exceptions = list(dict.fromkeys(str(v) for v in proxies.get("ExceptionsList") or ()))
+        evidence = {"source": "SCDynamicStore", "key": _SC_PROXIES_KEY}
+    else:
+        # ---- 1b) Fall back to parsing scutil --proxy ----
+        cmd = _SCUTIL_PROXY_CMD
+        rc, stdout, stderr = run_cmd(cmd)
+
+        evidence = get_evidence(_CMD_LABELS[cmd], rc, stdout, stderr)
+        evidence["scdynamicstore_error"] = store_error
+
+        if rc != 0:
+            return {
+                "not_checked": True,
+                "error": stderr or stdout or "scutil --proxy failed",
+                "remediation": "Ensure scutil is available and run with appropriate permissions.",
+                "http": {"enabled": None, "host": None, "port": None},
+                "https": {"enabled": None, "host": None, "port": None},
+                "socks": {"enabled": None, "host": None, "port": None},
+                "pac": {"enabled": None, "url": None},
+                "exceptions": [],
+                "evidence": evidence,
+            }
+
+        kv, exceptions = _parse_scutil_proxy(stdout)
+
     # ---- 2) Small helpers to convert types ----
     def _bool_from_01(v: str | None) -> bool | None:
         if v is None:
@@ -165,50 +492,6 @@ def get_mac_proxy_config() -> dict[str, Any]:
     pac_enabled = _bool_from_01(kv.get("ProxyAutoConfigEnable"))
     pac_url = kv.get("ProxyAutoConfigURLString")
 
-    # ---- 4) Best-effort ExceptionsList parsing ----
-    # scutil sometimes prints ExceptionsList on one line, sometimes as a block/array.
-    # MVP approach:
-    #   - if there’s a scalar line "ExceptionsList : ..." capture it
-    #   - plus: capture quoted items inside the block if present (best-effort)
-    exceptions: list[str] = []
-    in_exceptions_block = False
-
-    for line in lines:
-        s = line.strip()
-
-        # Start of the ExceptionsList section
-        if s.startswith("ExceptionsList"):
-            # Could be "ExceptionsList : <array> {"
-            # or "ExceptionsList : something"
-            in_exceptions_block = True
-
-            # If there is a value on the same line after ":", try to parse it lightly
-            if ":" in s:
-                tail = s.split(":", 1)[1].strip()
-                # If it's a simple single token (not an array opener), capture it
-                # (rare, but harmless)
-                if tail and not tail.startswith("<array>"):
-                    exceptions.append(tail)
-            continue
-
-        # If we're in the ExceptionsList block, try to extract items.
-        if in_exceptions_block:
-            # End of array block often contains "}"
-            if s.startswith("}"):
-                in_exceptions_block = False
-                continue
-
-            # Common formats in the block:
-            #   0 : localhost
-            #   1 : 127.0.0.1
-            #   2 : *.local
-            #
-            # We'll capture text after ":" when it looks like "N : value"
-            if ":" in s:
-                tail = s.split(":", 1)[1].strip()
-                if tail and tail not in exceptions:
-                    exceptions.append(tail)
-
     return {
         "http": {
             "enabled": http_enabled,
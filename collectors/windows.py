@@ -1,49 +1,397 @@
-import wmi
+import ctypes
+import threading
+from ctypes import wintypes
+
+from helpers.cache import ttl_cache
+
+# One WMI connection per thread; every wmi.WMI() call is a fresh COM/DCOM
+# connection setup, so each thread creates it on first use and reuses it.
+# COM objects belong to the apartment (thread) that created them, so the
+# connection can't be shared across threads (e.g. ThreadPoolExecutor
+# workers), and each thread must CoInitialize before making one.
+# wmi/pythoncom (pywin32/COM) are imported here too, so merely importing
+# this module costs nothing on macOS/Linux.
+_local = threading.local()
+
+
+def _conn():
+    """This thread's WMI connection (CoInitialize + wmi.WMI() on first use)."""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        import pythoncom
+        import wmi
+        pythoncom.CoInitialize()
+        conn = _local.conn = wmi.WMI()
+    return conn
+
+
+# Free space moves, so keep this short: long enough that one audit pass
+# (file-system + hardware collectors) enumerates the disks only once.
+@ttl_cache(seconds=60)
+def _logical_disks():
+    """
+    Single Win32_LogicalDisk query shared by the file-system and hardware
+    collectors (they need overlapping columns of the same rows).
+    Cached for a minute; treat the returned rows as read-only.
+
+    Rows are copied out into plain dicts: the cached value may be read from
+    another thread, where the COM row objects would not be usable.
+    """
+    return tuple(
+        {
+            "DeviceID": disk.DeviceID,
+            "FileSystem": disk.FileSystem,
+            "Size": disk.Size,
+            "FreeSpace": disk.FreeSpace,
+            "VolumeName": disk.VolumeName,
+        }
+        for disk in _conn().query(
+            "SELECT DeviceID, FileSystem, Size, FreeSpace, VolumeName FROM Win32_LogicalDisk"
+        )
+    )
+
+
+# -----------------------------
+# Native Win32 bindings (ctypes)
+# -----------------------------
+# Version/architecture and local accounts are available straight from
+# ntdll/kernel32/netapi32, without a COM round-trip through WMI. Everything
+# here raises OSError (or AttributeError off Windows, where ctypes has no
+# WinDLL) so callers can fall back to WMI.
+class _OSVersionInfoExW(ctypes.Structure):
+    _fields_ = [
+        ("dwOSVersionInfoSize", wintypes.DWORD),
+        ("dwMajorVersion", wintypes.DWORD),
+        ("dwMinorVersion", wintypes.DWORD),
+        ("dwBuildNumber", wintypes.DWORD),
+        ("dwPlatformId", wintypes.DWORD),
+        ("szCSDVersion", wintypes.WCHAR * 128),
+        ("wServicePackMajor", wintypes.WORD),
+        ("wServicePackMinor", wintypes.WORD),
+        ("wSuiteMask", wintypes.WORD),
+        ("wProductType", wintypes.BYTE),
+        ("wReserved", wintypes.BYTE),
+    ]
+
+
+class _SystemInfo(ctypes.Structure):
+    _fields_ = [
+        ("wProcessorArchitecture", wintypes.WORD),
+        ("wReserved", wintypes.WORD),
+        ("dwPageSize", wintypes.DWORD),
+        ("lpMinimumApplicationAddress", wintypes.LPVOID),
+        ("lpMaximumApplicationAddress", wintypes.LPVOID),
+        ("dwActiveProcessorMask", ctypes.c_size_t),
+        ("dwNumberOfProcessors", wintypes.DWORD),
+        ("dwProcessorType", wintypes.DWORD),
+        ("dwAllocationGranularity", wintypes.DWORD),
+        ("wProcessorLevel", wintypes.WORD),
+        ("wProcessorRevision", wintypes.WORD),
+    ]
+
+
+class _UserInfo20(ctypes.Structure):
+    _fields_ = [
+        ("usri20_name", wintypes.LPWSTR),
+        ("usri20_full_name", wintypes.LPWSTR),
+        ("usri20_comment", wintypes.LPWSTR),
+        ("usri20_flags", wintypes.DWORD),
+        ("usri20_user_id", wintypes.DWORD),     # RID
+    ]
+
+
+class _UserModalsInfo2(ctypes.Structure):
+    _fields_ = [
+        ("usrmod2_domain_name", wintypes.LPWSTR),
+        ("usrmod2_domain_id", wintypes.LPVOID),   # PSID of the account domain
+    ]
+
+
+class _WtsSessionInfoW(ctypes.Structure):
+    _fields_ = [
+        ("SessionId", wintypes.DWORD),
+        ("pWinStationName", wintypes.LPWSTR),
+        ("State", ctypes.c_int),                  # WTS_CONNECTSTATE_CLASS
+    ]
+
+
+# PROCESSOR_ARCHITECTURE_* -> the same labels Win32_OperatingSystem.OSArchitecture uses
+_ARCH_LABELS = {0: "32-bit", 5: "32-bit", 6: "64-bit", 9: "64-bit", 12: "64-bit"}
+
+_UF_ACCOUNTDISABLE = 0x0002
+_UF_LOCKOUT = 0x0010
+_FILTER_NORMAL_ACCOUNT = 0x0002
+_MAX_PREFERRED_LENGTH = 0xFFFFFFFF
+_NERR_SUCCESS = 0
+_ERROR_MORE_DATA = 234
+_WTS_CURRENT_SERVER_HANDLE = None
+_WTS_ACTIVE = 0
+_WTS_DISCONNECTED = 4
+
+# Registry keys holding what Win32_OperatingSystem/Win32_BIOS/
+# Win32_ComputerSystemProduct would report (SMBIOS data is mirrored under
+# HARDWARE\DESCRIPTION\System at boot)
+_CURRENT_VERSION_KEY = r"SOFTWARE\Microsoft\Windows NT\CurrentVersion"
+_SYSTEM_KEY = r"HARDWARE\DESCRIPTION\System"
+_SYSTEM_BIOS_KEY = r"HARDWARE\DESCRIPTION\System\BIOS"
+# First Windows 11 build; ProductName still says "Windows 10" there
+_WIN11_FIRST_BUILD = 22000
+
+
+def _native_os_version() -> dict:
+    """
+    OS version/build via RtlGetVersion (not subject to the GetVersionEx
+    manifest shim) and architecture via GetNativeSystemInfo (not the WOW64 view).
+    """
+    info = _OSVersionInfoExW()
+    info.dwOSVersionInfoSize = ctypes.sizeof(info)
+    status = ctypes.WinDLL("ntdll").RtlGetVersion(ctypes.byref(info))
+    if status != 0:
+        raise OSError(f"RtlGetVersion failed with NTSTATUS {status:#x}")
+
+    sysinfo = _SystemInfo()
+    ctypes.WinDLL("kernel32").GetNativeSystemInfo(ctypes.byref(sysinfo))
+
+    return {
+        "os_version": f"{info.dwMajorVersion}.{info.dwMinorVersion}.{info.dwBuildNumber}",
+        "build_number": str(info.dwBuildNumber),
+        "architecture": _ARCH_LABELS.get(sysinfo.wProcessorArchitecture),
+    }
+
+
+def _reg_values(path: str, names: tuple[str, ...]) -> dict:
+    """Read `names` from HKLM\\<path>; missing values come back as None."""
+    import winreg   # Windows-only stdlib module
+
+    values = {}
+    with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, path) as key:
+        for name in names:
+            try:
+                values[name] = winreg.QueryValueEx(key, name)[0]
+            except FileNotFoundError:
+                values[name] = None
+    return values
+
+
+def _native_os_identity(build_number: str) -> dict:
+    """
+    OS product name plus BIOS/system identity from the registry.
+    Raises OSError (ImportError off Windows) so callers can fall back to WMI.
+    """
+    product_name = _reg_values(_CURRENT_VERSION_KEY, ("ProductName",))["ProductName"]
+    if product_name and int(build_number) >= _WIN11_FIRST_BUILD and product_name.startswith("Windows 10"):
+        product_name = "Windows 11" + product_name[len("Windows 10"):]
+    system = _reg_values(_SYSTEM_KEY, ("SystemBiosVersion",))
+    bios = _reg_values(_SYSTEM_BIOS_KEY, ("SystemManufacturer", "SystemProductName"))
+    return {
+        # Win32_OperatingSystem.Caption is "Microsoft " + ProductName
+        "os_name": f"Microsoft {product_name}" if product_name else None,
+        # REG_MULTI_SZ, same list Win32_BIOS.BIOSVersion returns
+        "bios": system["SystemBiosVersion"],
+        "system_product": bios["SystemProductName"],
+        "system_manufacturer": bios["SystemManufacturer"],
+    }
+
+
+def _sid_to_str(psid) -> str | None:
+    if not psid:
+        return None
+    out = wintypes.LPWSTR()
+    advapi32 = ctypes.WinDLL("advapi32")
+    if not advapi32.ConvertSidToStringSidW(wintypes.LPVOID(psid), ctypes.byref(out)):
+        return None
+    try:
+        return out.value
+    finally:
+        ctypes.WinDLL("kernel32").LocalFree(out)
+
+
+def _account_domain_sid(netapi32) -> str | None:
+    """The local account domain's SID (S-1-5-21-...) via NetUserModalsGet level 2."""
+    buf = ctypes.POINTER(_UserModalsInfo2)()
+    if netapi32.NetUserModalsGet(None, 2, ctypes.byref(buf)) != _NERR_SUCCESS:
+        return None
+    try:
+        return _sid_to_str(buf.contents.usrmod2_domain_id)
+    finally:
+        netapi32.NetApiBufferFree(buf)
+
+
+def _native_session_count() -> int:
+    """
+    Interactive user sessions via WTSEnumerateSessionsW; counts active and
+    disconnected (still logged on) sessions, like Win32_OperatingSystem.NumberOfUsers.
+    """
+    wtsapi32 = ctypes.WinDLL("wtsapi32")
+    wtsapi32.WTSEnumerateSessionsW.argtypes = [
+        wintypes.HANDLE, wintypes.DWORD, wintypes.DWORD,
+        ctypes.POINTER(ctypes.POINTER(_WtsSessionInfoW)), ctypes.POINTER(wintypes.DWORD),
+    ]
+    wtsapi32.WTSFreeMemory.argtypes = [wintypes.LPVOID]
+
+    buf = ctypes.POINTER(_WtsSessionInfoW)()
+    count = wintypes.DWORD(0)
+    if not wtsapi32.WTSEnumerateSessionsW(_WTS_CURRENT_SERVER_HANDLE, 0, 1, ctypes.byref(buf), ctypes.byref(count)):
+        raise ctypes.WinError()
+    try:
+        # Session 0 is services only; nobody logs on there
+        return sum(
+            1 for i in range(count.value)
+            if buf[i].SessionId != 0 and buf[i].State in (_WTS_ACTIVE, _WTS_DISCONNECTED)
+        )
+    finally:
+        wtsapi32.WTSFreeMemory(buf)
+
+
+def _native_local_users() -> list[dict]:
+    """
+    Local user accounts via NetUserEnum level 20 (name, full name, flags, RID).
+    NetUserEnum has no level that returns the SID; rather than one
+    NetUserGetInfo per account, each SID is the account domain's SID (one
+    NetUserModalsGet call) plus the account's RID.
+    """
+    netapi32 = ctypes.WinDLL("netapi32")
+    netapi32.NetUserEnum.argtypes = [
+        wintypes.LPCWSTR, wintypes.DWORD, wintypes.DWORD,
+        ctypes.POINTER(ctypes.POINTER(_UserInfo20)), wintypes.DWORD,
+        ctypes.POINTER(wintypes.DWORD), ctypes.POINTER(wintypes.DWORD),
+        ctypes.POINTER(wintypes.DWORD),
+    ]
+    netapi32.NetUserModalsGet.argtypes = [
+        wintypes.LPCWSTR, wintypes.DWORD, ctypes.POINTER(ctypes.POINTER(_UserModalsInfo2)),
+    ]
+    netapi32.NetApiBufferFree.argtypes = [wintypes.LPVOID]
+
+    domain_sid = _account_domain_sid(netapi32)
+    users = []
+    resume = wintypes.DWORD(0)
+    while True:
+        buf = ctypes.POINTER(_UserInfo20)()
+        read, total = wintypes.DWORD(0), wintypes.DWORD(0)
+        status = netapi32.NetUserEnum(
+            None, 20, _FILTER_NORMAL_ACCOUNT, ctypes.byref(buf), _MAX_PREFERRED_LENGTH,
+            ctypes.byref(read), ctypes.byref(total), ctypes.byref(resume),
+        )
+        if status not in (_NERR_SUCCESS, _ERROR_MORE_DATA):
+            raise OSError(f"NetUserEnum failed with status {status}")
+        try:
+            for i in range(read.value):
+                entry = buf[i]
+                flags = entry.usri20_flags
+                users.append({
+                    "name": entry.usri20_name,
+                    "full_name": entry.usri20_full_name,
+                    # Win32_UserAccount reports disabled/locked-out accounts as "Degraded"
+                    "status": "Degraded" if flags & (_UF_ACCOUNTDISABLE | _UF_LOCKOUT) else "OK",
+                    "sid": f"{domain_sid}-{entry.usri20_user_id}" if domain_sid else None,
+                    "disabled": bool(flags & _UF_ACCOUNTDISABLE),
+                })
+        finally:
+            if buf:
+                netapi32.NetApiBufferFree(buf)
+        if status != _ERROR_MORE_DATA:
+            return users
+
 
 def get_windows_operating_system_info():
     """
-        Retrieve Windows operating system information using WMI.
+        Retrieve Windows operating system information.
         Identity and Context - Who/What is this Windows machine.
 
+        Version, build and architecture come from the Win32 API, and the
+        product name, BIOS and system product from the registry, so no
+        COM/WMI connection is made. WMI is only used if those fail.
+        The lookup is cached (see _os_info); each call gets its own dict.
+
         Returns:
             dict: A dictionary containing OS information.
     """
-    c = wmi.WMI()
-    os_info = c.Win32_OperatingSystem()[0]
+    info = _os_info()
+    # bios is a list (REG_MULTI_SZ / Win32_BIOS array); copy it too
+    return info | {"bios": list(info["bios"]) if info["bios"] is not None else None}
+
+
+# OS identity doesn't change while we run; re-read it at most every 15 minutes.
+@ttl_cache(seconds=900)
+def _os_info():
+    """get_windows_operating_system_info's lookup; the result is shared, treat as read-only."""
+    try:
+        native = _native_os_version()
+        identity = _native_os_identity(native["build_number"])
+    except (OSError, ImportError, AttributeError, ValueError):
+        native = identity = None
+
+    if native is not None:
+        return {
+            "os_name": identity["os_name"],
+            "os_version": native["os_version"],
+            "architecture": native["architecture"],
+            "bios": identity["bios"],
+            "system_product": identity["system_product"],
+            # Win32_OperatingSystem.Manufacturer is always Microsoft's
+            "manufacturer": "Microsoft Corporation",
+            "system_manufacturer": identity["system_manufacturer"],
+            "build_number": native["build_number"],
+        }
+
+    # Fallback: only the columns we use, one query per class.
+    # BIOS version and product name live on their own classes, not Win32_OperatingSystem.
+    c = _conn()
+    os_info = c.query(
+        "SELECT Caption, Version, OSArchitecture, Manufacturer, BuildNumber FROM Win32_OperatingSystem"
+    )[0]
+    bios = c.query("SELECT BIOSVersion FROM Win32_BIOS")
+    product = c.query("SELECT Name, Vendor FROM Win32_ComputerSystemProduct")
     system_info = {
         "os_name": os_info.Caption,
         "os_version": os_info.Version,
         "architecture": os_info.OSArchitecture,
-        "bios": os_info.BIOSVersion,
-        "system_product": os_info.SystemProduct,
+        "bios": bios[0].BIOSVersion if bios else None,
+        "system_product": product[0].Name if product else None,
         "manufacturer": os_info.Manufacturer,
+        "system_manufacturer": product[0].Vendor if product else None,
         "build_number": os_info.BuildNumber,
     }
     return system_info
 
 def get_windows_file_system_info():
     """Retrieve Windows file system information using WMI."""
-    c = wmi.WMI()
     file_systems = []
-    for fs in c.Win32_LogicalDisk():
+    for fs in _logical_disks():
         fs_info = {
-            "system_directory": fs.SystemDirectory,
-            "device_id": fs.DeviceID,
-            "file_system": fs.FileSystem,
-            "size": fs.Size,
-            "free_space": fs.FreeSpace,
-            "volume_name": fs.VolumeName,
+            # SystemDirectory is not a Win32_LogicalDisk property
+            "system_directory": fs.get("SystemDirectory"),
+            "device_id": fs["DeviceID"],
+            "file_system": fs["FileSystem"],
+            "size": fs["Size"],
+            "free_space": fs["FreeSpace"],
+            "volume_name": fs["VolumeName"],
         }
         file_systems.append(fs_info)
     return file_systems
 
 def get_windows_users():
-    """Retrieve Windows user account information using WMI."""
-    c = wmi.WMI()
-    num_users = c.NumberOfUsers
+    """
+    Retrieve Windows user account information.
+    Local accounts come from NetUserEnum and the session count from
+    WTSEnumerateSessionsW; WMI is only used for whichever native call fails.
+    """
+    try:
+        num_users = _native_session_count()
+    except (OSError, AttributeError):
+        # NumberOfUsers is a Win32_OperatingSystem property (current sessions)
+        os_rows = _conn().query("SELECT NumberOfUsers FROM Win32_OperatingSystem")
+        num_users = os_rows[0].NumberOfUsers if os_rows else None
+
+    try:
+        return num_users, _native_local_users()
+    except (OSError, AttributeError):
+        pass
+
+    c = _conn()
     # Get user account details
     users = []               # list to hold user account details
-    for user in c.Win32_UserAccount():  # iterate through user accounts
+    for user in c.query("SELECT Name, FullName, Status, SID, Disabled FROM Win32_UserAccount"):  # iterate through user accounts
         user_info = {
             "name": user.Name,
             "full_name": user.FullName,
@@ -61,7 +409,7 @@ def get_windows_hardware_details():
         Hardware and Capacity - What is inside this Windows machine.
     """
 
-    c = wmi.WMI()
+    c = _conn()
     # Initialise hardware details dictionary
     hardware_details = {
         "cpu": [],
@@ -71,7 +419,7 @@ def get_windows_hardware_details():
     }
 
     # Get CPU details
-    for cpu in c.Win32_Processor():
+    for cpu in c.query("SELECT Name, Manufacturer, MaxClockSpeed, NumberOfCores FROM Win32_Processor"):
         cpu_info = {
             "name": cpu.Name,
             "manufacturer": cpu.Manufacturer,
@@ -81,7 +429,7 @@ def get_windows_hardware_details():
         hardware_details["cpu"].append(cpu_info)
 
     # Get RAM details
-    for mem in c.Win32_PhysicalMemory():
+    for mem in c.query("SELECT Capacity, Speed, Manufacturer FROM Win32_PhysicalMemory"):
         mem_info = {
             "capacity": mem.Capacity,
             "speed": mem.Speed,
@@ -90,17 +438,17 @@ def get_windows_hardware_details():
         hardware_details["memory"].append(mem_info)
 
     # Get Logical Disk details
-    for l_disk in c.Win32_LogicalDisk():
+    for l_disk in _logical_disks():
         disk_info = {
-            "device_id": l_disk.DeviceID,
-            "file_system": l_disk.FileSystem,
-            "size": l_disk.Size,
-            "free_space": l_disk.FreeSpace,
+            "device_id": l_disk["DeviceID"],
+            "file_system": l_disk["FileSystem"],
+            "size": l_disk["Size"],
+            "free_space": l_disk["FreeSpace"],
         }
         hardware_details["disk_drives"].append(disk_info)
 
     # Get Physical Disk details
-    for disk in c.Win32_DiskDrive():
+    for disk in c.query("SELECT Model, Size, InterfaceType FROM Win32_DiskDrive"):
         disk_info = {
             "model": disk.Model,
             "size": disk.Size,
@@ -109,7 +457,9 @@ def get_windows_hardware_details():
         hardware_details["disk_drives"].append(disk_info)
 
     # Get Network Adapter details
-    for adapter in c.Win32_NetworkAdapterConfiguration(IPEnabled=True):
+    for adapter in c.query(
+        "SELECT Description, MACAddress, IPAddress FROM Win32_NetworkAdapterConfiguration WHERE IPEnabled = TRUE"
+    ):
         adapter_info = {
             "description": adapter.Description,
             "mac_address": adapter.MACAddress,
@@ -121,13 +471,13 @@ def get_windows_hardware_details():
 
 def get_windows_security_details():
     """Retrieve Windows security details using WMI."""
-    c = wmi.WMI()
+    c = _conn()
     security_details = {
         "antivirus_products": [],
         "firewall_enabled": None,
     }
     # Get Antivirus details
-    for av in c.Win32_AntivirusProduct():
+    for av in c.query("SELECT DisplayName, Version, ProductState FROM Win32_AntivirusProduct"):
         av_info = {
             "name": av.DisplayName,
             "version": av.Version,
@@ -136,11 +486,11 @@ def get_windows_security_details():
         security_details["antivirus_products"].append(av_info)
 
     # Get Firewall details
-    for fw in c.Win32_FirewallProduct():
+    for fw in c.query("SELECT Enabled FROM Win32_FirewallProduct"):
         security_details["firewall_enabled"] = fw.Enabled
 
     # Get Encryption details
-    for enc in c.Win32_EncryptableVolume():
+    for enc in c.query("SELECT DeviceID, ProtectionStatus FROM Win32_EncryptableVolume"):
         enc_info = {
             "device_id": enc.DeviceID,
             "protection_status": enc.ProtectionStatus,
@@ -6,14 +6,14 @@ from typing import Literal, Any
 Status = Literal["PASS", "WARN", "FAIL", "INFO", "NOT_CHECKED"]
 Severity = Literal["LOW", "MEDIUM", "HIGH", "CRITICAL"]
 
-@dataclass
+@dataclass(slots=True)
 class Finding:
     severity: Severity
     title: str
     detail: str
     remediation: str
 
-@dataclass
+@dataclass(slots=True)
 class AuditResult:
     id: str
     name: str
@@ -23,7 +23,7 @@ class AuditResult:
     evidence: dict[str, Any] = field(default_factory=dict)
     findings: list[Finding] = field(default_factory=list)
 
-@dataclass
+@dataclass(slots=True)
 class AuditReport:
     meta: dict[str, Any]
     host: dict[str, Any]
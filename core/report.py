@@ -1,12 +1,58 @@
 import json
-from dataclasses import asdict
+import os
+from dataclasses import fields, is_dataclass
 from pathlib import Path
 
+# orjson is optional: it serialises dataclasses natively (no intermediate dicts)
+# and is much faster than the stdlib encoder. Fall back to json if missing.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _default(o):
+    """
+    json `default=` hook: hand dataclasses to the encoder as a shallow
+    field -> value dict. Unlike asdict() this doesn't deep-copy the nested
+    findings/evidence containers; the encoder walks the originals.
+    """
+    if is_dataclass(o) and not isinstance(o, type):
+        return {f.name: getattr(o, f.name) for f in fields(o)}
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+def _encode(report) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(report, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+
+    # report may be an AuditReport or a plain dict (see main.py)
+    return json.dumps(report, default=_default, indent=2, ensure_ascii=False).encode("utf-8")
+
 def write_json_report(report, out_path: str | Path) -> Path:
+    """
+    Write the report as JSON, atomically.
+
+    The bytes go to a sibling .tmp file created 0600 (reports contain host
+    details), are fsync'd, then renamed over out_path, so readers see either
+    the old report or the complete new one, never a truncated file.
+    """
     out_path = Path(out_path)
     out_path.parent.mkdir(parents=True, exist_ok=True)
 
-    with out_path.open("w", encoding="utf-8") as f:
-        json.dump(asdict(report), f, indent=2, ensure_ascii=False)
+    data = _encode(report)
+    tmp_path = out_path.with_suffix(out_path.suffix + ".tmp")
+
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    try:
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, out_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
 
-    return out_path
\ No newline at end of file
+    return out_path
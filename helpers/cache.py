@@ -0,0 +1,33 @@
+import functools
+import time
+
+
+def ttl_cache(seconds: float, maxsize: int = 1):
+    """
+    Memoize a function for roughly `seconds` seconds.
+
+    Built on functools.lru_cache with the current time bucket
+    (time.monotonic() // seconds) as a hidden extra argument: calls inside the
+    same bucket hit the cache, the first call in a new bucket recomputes.
+    With maxsize=1 the stale bucket is evicted as soon as the new one is
+    stored, so at most one snapshot is kept per distinct argument set.
+
+    Use for collectors whose answer rarely changes during a run (DNS, routes,
+    proxies, OS identity) but is expensive to fetch (subprocess, WMI, etc.).
+
+    The wrapped function gets a cache_clear() attribute to force a refresh.
+    Note: callers share the cached object, so treat results as read-only.
+    """
+    def decorator(fn):
+        @functools.lru_cache(maxsize=maxsize)
+        def _cached(_bucket, *args, **kwargs):
+            return fn(*args, **kwargs)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            return _cached(int(time.monotonic() // seconds), *args, **kwargs)
+
+        wrapper.cache_clear = _cached.cache_clear
+        return wrapper
+
+    return decorator
@@ -1,6 +1,213 @@
+import hashlib
+import os
+import re
+import select
+import shlex
+import signal
 import subprocess
+import threading
+import time
+import weakref
+from collections.abc import Sequence
 
-def run_cmd(cmd: list[str], timeout_s: int = 10) -> tuple[int, str, str]:
+# Markers printed between command segments by run_cmd_batch.
+# stdout carries each segment's exit code; NULs never appear in normal text output.
+_BATCH_RC_RE = re.compile(r"\0---(\d+)\0")
+_BATCH_ERR_SEP = "\0---\0"
+
+
+class CommandRunner:
+    """
+    A long-lived /bin/sh that runs commands written to its stdin.
+
+    Forking the (large) Python process for every command is the main cost of
+    run_cmd; here we start one shell and let it do the per-command
+    fork/exec. After each command the shell prints a NUL-framed end marker
+    (with $? on stdout) so we know where one command's output stops.
+
+    Notes:
+      - The shell is started with os.posix_spawn (vfork/clone(CLONE_VFORK)
+        under the hood on Linux and macOS) rather than subprocess' fork, so
+        the auditor's page tables are not duplicated to launch it.
+      - The shell is started on first use and restarted if it dies or a
+        command times out.
+      - The shell leads its own process group, and the commands it runs stay
+        in it (no job control), so on timeout the whole group is SIGKILLed:
+        the command that hung dies with the shell instead of being orphaned.
+      - Commands see the environment/cwd the shell was started with.
+      - One runner per thread (see _runner()), so parallel collectors
+        don't serialise behind a single shell; it is closed when its thread
+        exits (or at interpreter exit).
+    """
+
+    _END_OUT_RE = re.compile(rb"\0__END__\0(\d+)\0\Z")
+    _END_ERR = b"\0__END__\0"
+
+    def __init__(self) -> None:
+        self._pid: int | None = None
+        self._fds: tuple[int, int, int] | None = None   # (stdin w, stdout r, stderr r)
+        self._exit_code: int | None = None
+
+    def _start(self) -> tuple[int, int, int]:
+        in_r, in_w = os.pipe()
+        out_r, out_w = os.pipe()
+        err_r, err_w = os.pipe()
+        child_ends = (in_r, out_w, err_w)
+        try:
+            self._pid = os.posix_spawn(
+                "/bin/sh",
+                ["/bin/sh"],
+                os.environ,
+                file_actions=[
+                    (os.POSIX_SPAWN_DUP2, in_r, 0),
+                    (os.POSIX_SPAWN_DUP2, out_w, 1),
+                    (os.POSIX_SPAWN_DUP2, err_w, 2),
+                ],
+                setpgroup=0,    # pgid == shell pid
+            )
+        except OSError:
+            for fd in (*child_ends, in_w, out_r, err_r):
+                os.close(fd)
+            raise
+        # Pipes are O_CLOEXEC, so the shell only keeps the dup2'd copies
+        for fd in child_ends:
+            os.close(fd)
+        self._fds = (in_w, out_r, err_r)
+        return self._fds
+
+    def _poll(self) -> int | None:
+        """Return the shell's exit code if it has exited (reaping it), else None."""
+        if self._exit_code is None and self._pid is not None:
+            pid, status = os.waitpid(self._pid, os.WNOHANG)
+            if pid:
+                self._exit_code = os.waitstatus_to_exitcode(status)
+        return self._exit_code
+
+    def _kill_group(self) -> None:
+        """SIGKILL the shell's process group and reap the shell."""
+        # Only while the shell is unreaped: its pid (== pgid) can't have
+        # been reused by an unrelated process group yet.
+        try:
+            os.killpg(self._pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        _, status = os.waitpid(self._pid, 0)
+        self._exit_code = os.waitstatus_to_exitcode(status)
+
+    def close(self, kill: bool = False) -> int | None:
+        """
+        Stop the shell and return its exit code.
+
+        Normally: EOF on stdin, then SIGKILL to the process group after 1s.
+        kill=True (a command timed out) skips the grace period and kills the
+        group straight away, taking the running command with it.
+        """
+        if self._pid is None:
+            return None
+        in_w, out_r, err_r = self._fds
+        if not kill:
+            os.close(in_w)          # EOF on stdin makes the shell exit
+            deadline = time.monotonic() + 1
+            while self._poll() is None and time.monotonic() < deadline:
+                time.sleep(0.005)
+        if self._exit_code is None:
+            self._kill_group()
+        if kill:
+            os.close(in_w)
+        os.close(out_r)
+        os.close(err_r)
+        rc = self._exit_code
+        self._pid = self._fds = self._exit_code = None
+        return rc
+
+    def _write(self, fd: int, data: bytes) -> None:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+
+    def run(self, script: str, timeout_s: float) -> tuple[int, bytes, bytes]:
+        """
+        Run a shell snippet and return (rc, stdout bytes, stderr bytes).
+        Raises subprocess.TimeoutExpired like subprocess.run would.
+        """
+        fds = self._fds
+        if fds is None or self._poll() is not None:
+            self.close()
+            fds = self._start()
+
+        payload = f"{script}\nprintf '\\0__END__\\0%d\\0' \"$?\"; printf '\\0__END__\\0' >&2\n".encode()
+        try:
+            self._write(fds[0], payload)
+        except BrokenPipeError:
+            # Shell exited between the liveness check and write(); start a fresh one
+            self.close()
+            fds = self._start()
+            self._write(fds[0], payload)
+
+        out, err = bytearray(), bytearray()
+        out_fd, err_fd = fds[1], fds[2]
+        bufs = {out_fd: out, err_fd: err}
+        pending = set(bufs)
+        rc: int | None = None
+        deadline = time.monotonic() + timeout_s
+
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.close(kill=True)
+                raise subprocess.TimeoutExpired(script, timeout_s)
+            ready, _, _ = select.select(list(pending), [], [], remaining)
+            for fd in ready:
+                chunk = os.read(fd, 65536)
+                buf = bufs[fd]
+                if not chunk:
+                    # Shell went away mid-command (e.g. it was killed)
+                    pending.discard(fd)
+                    continue
+                buf += chunk
+                if buf is out:
+                    m = self._END_OUT_RE.search(out, max(0, len(out) - 32))
+                    if m:
+                        rc = int(m.group(1))
+                        del out[m.start():]
+                        pending.discard(fd)
+                elif err.endswith(self._END_ERR):
+                    del err[-len(self._END_ERR):]
+                    pending.discard(fd)
+
+        if rc is None:
+            rc = self.close()
+        return rc, bytes(out), bytes(err)
+
+
+_local = threading.local()
+
+
+class _RunnerOwner:
+    """
+    Ties a CommandRunner to its thread. The owner lives in thread-local
+    storage, so it is freed when the thread exits (ThreadPoolExecutor
+    workers retiring, etc.), and its finalizer closes the runner's shell.
+    weakref.finalize also runs at interpreter exit for threads still alive.
+    """
+    __slots__ = ("runner", "__weakref__")
+
+    def __init__(self) -> None:
+        self.runner = CommandRunner()
+        # The callback holds the runner, not the owner, so it can't keep
+        # the owner alive
+        weakref.finalize(self, self.runner.close)
+
+
+def _runner() -> CommandRunner:
+    """Return this thread's CommandRunner, creating it on first use."""
+    owner = getattr(_local, "owner", None)
+    if owner is None:
+        owner = _local.owner = _RunnerOwner()
+    return owner.runner
+
+
+def run_cmd(cmd: Sequence[str], timeout_s: int = 10) -> tuple[int, str, str]:
     """
     Run a command and return:
       - return code (rc)
@@ -9,23 +216,118 @@ def run_cmd(cmd: list[str], timeout_s: int = 10) -> tuple[int, str, str]:
 
     We capture output so we can store it in the AuditResult.evidence field
     for transparency/debugging (useful for client reports too).
+
+    Commands go through this thread's persistent shell (CommandRunner), so
+    a missing binary comes back as rc=127 with the shell's "not found"
+    message rather than raising FileNotFoundError.
     """
 
-    p = subprocess.run(
-        cmd,
-        text=True,              # decode output to str instead of bytes
-        capture_output=True,    # capture stdout/stderr
-        timeout=timeout_s
+    rc, out, err = _runner().run(f"{shlex.join(cmd)} </dev/null", timeout_s)
+
+    # Decode once, as UTF-8, at the evidence boundary. Unlike text=True this
+    # skips the locale lookup and newline translation pass, and a stray
+    # non-UTF-8 byte can't raise UnicodeDecodeError mid-audit.
+    # Normalise whitespace
+    stdout = out.decode("utf-8", errors="replace").strip()
+    stderr = err.decode("utf-8", errors="replace").strip()
+    return rc, stdout, stderr
+
+def run_cmd_batch(segments: list[list[str]], timeout_s: int = 10) -> list[tuple[int, str, str]]:
+    """
+    Run several commands as ONE script in the persistent shell and return a
+    (rc, stdout, stderr) tuple per command, in the same order as run_cmd would.
+
+    Useful when a check needs a handful of quick queries of the same tool:
+    one round-trip to the shell instead of one per command.
+    Commands still run one after another inside the shell.
+    """
+    script = "".join(
+        f"{shlex.join(seg)} </dev/null; printf '\\0---%d\\0' \"$?\"; printf '\\0---\\0' >&2\n"
+        for seg in segments
     )
+    shell_rc, out, err = _runner().run(script, timeout_s)
+    stdout = out.decode("utf-8", errors="replace")
+    stderr = err.decode("utf-8", errors="replace")
+
+    # re.split with one capture group -> [out1, rc1, out2, rc2, ..., tail]
+    out_parts = _BATCH_RC_RE.split(stdout)
+    err_parts = stderr.split(_BATCH_ERR_SEP)
+
+    results: list[tuple[int, str, str]] = []
+    for i in range(len(segments)):
+        if 2 * i + 1 < len(out_parts):
+            rc = int(out_parts[2 * i + 1])
+            out_i = out_parts[2 * i]
+        else:
+            # The shell died before reaching this segment
+            rc = shell_rc if shell_rc != 0 else -1
+            out_i = ""
+        err_i = err_parts[i] if i < len(err_parts) else ""
+        results.append((rc, out_i.strip(), err_i.strip()))
+    return results
 
-    # Normalise None → "" and strip whitespace
-    return p.returncode, (p.stdout or "").strip(), (p.stderr or "").strip()
+# Raw stdout is kept out of evidence by default (see get_evidence). When set,
+# each distinct output is also written to <dir>/<digest>.txt.
+_RAW_EVIDENCE_DIR: str | None = None
+
+def enable_raw_evidence(directory: str = "evidence") -> str:
+    """
+    Also save raw command stdout next to the report (main.py --verbose).
+    Files are content-addressed by the digest get_evidence records.
+    """
+    global _RAW_EVIDENCE_DIR
+    os.makedirs(directory, exist_ok=True)
+    _RAW_EVIDENCE_DIR = directory
+    return directory
+
+def _save_raw_evidence(digest: str, data: bytes) -> None:
+    path = os.path.join(_RAW_EVIDENCE_DIR, f"{digest}.txt")
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        return      # same digest -> same bytes, already saved
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
 
 def get_evidence(cmd, rc, stdout, stderr):
+    """
+    Evidence for one command run.
+
+    stdout is recorded by reference (blake2b digest + length) rather than
+    inline, so the report stays small however chatty the command is; with
+    enable_raw_evidence() the full text is saved as evidence/<digest>.txt.
+    stderr stays inline: it's usually short and it's what explains failures.
+    """
+    data = stdout.encode("utf-8")
+    digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+    if _RAW_EVIDENCE_DIR is not None and data:
+        _save_raw_evidence(digest, data)
 
     return {
         "cmd": cmd,
         "rc": rc,
-        "stdout": stdout,
+        "stdout_sha": digest,
+        "stdout_len": len(stdout),
         "stderr": stderr
-    }
\ No newline at end of file
+    }
+
+def read_small_file(path: str, max_bytes: int = 65536) -> str:
+    """
+    Read a small system file (e.g. /etc/resolv.conf) in a single read() call.
+
+    Skips the buffered/text IO wrapper objects that open() builds, which
+    matters when collectors are polled repeatedly. Anything past max_bytes
+    is ignored; the files we read this way are a few KiB at most.
+
+    Raises OSError like open() would, so callers keep their error handling.
+    """
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        data = os.read(fd, max_bytes)
+    finally:
+        os.close(fd)
+    return data.decode("utf-8", errors="replace")
@@ -2,14 +2,16 @@
     Main entry point for the Asset Auditing tool
 """
 from shared.system import get_system_info, get_os, get_user_information
-from shared.hardware import get_hardware_info, get_cpu_info, get_disk_info, get_battery_info
+from shared.hardware import get_hardware_info, get_cpu_info, get_disk_info, get_battery_info, start_cpu_sampler
 from collectors.mac import get_mac_network_info, check_mac_firewall_status, check_mac_filevault_status
 from reports.formatter import print_disk_info
 from core.report import write_json_report
+from helpers.unix import enable_raw_evidence
 
 from shared.network import get_net_addr, get_listening_ports
 
-import os, pwd, subprocess
+import argparse, os, pwd, subprocess
+from concurrent.futures import ThreadPoolExecutor
 
 def main():
     """
@@ -17,9 +19,34 @@ def main():
         Right now using it to test individual collectors.
     """
 
-    print(get_listening_ports())
+    # Start measuring CPU% before anything else so get_cpu_info() has a real
+    # window to report (it waits for the first one if needed)
+    start_cpu_sampler()
 
-    print(get_hardware_info())
+    parser = argparse.ArgumentParser(description="Asset Auditing tool")
+    parser.add_argument("-v", "--verbose", action="store_true",
+                        help="also save raw command output as results/evidence/<digest>.txt")
+    args = parser.parse_args()
+    if args.verbose:
+        enable_raw_evidence("results/evidence")
+
+    # Collectors are independent and mostly wait on I/O (subprocess, /proc, WMI),
+    # so run them side by side and print in a stable order afterwards.
+    # Anything added here must be safe to call from a worker thread and return
+    # plain data. WMI-backed (collectors/windows.py) collectors are: _conn()
+    # CoInitializes and opens a connection per thread; never hand a COM object
+    # from one task to another.
+    tasks = {
+        "listening_ports": get_listening_ports,
+        "hardware": get_hardware_info,
+    }
+    with ThreadPoolExecutor(max_workers=8) as ex:
+        futures = {name: ex.submit(fn) for name, fn in tasks.items()}
+        results = {name: f.result() for name, f in futures.items()}
+
+    print(results["listening_ports"])
+
+    print(results["hardware"])
 
     """system_info = get_system_info()
     print("\nSystem Information:")
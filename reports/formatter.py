@@ -1,6 +1,7 @@
 """
     Report formatting functions
 """
+import sys
 
 def print_helper(print_line, dict_item):
     print(f"\n{print_line}:")
@@ -10,16 +11,21 @@ def print_helper(print_line, dict_item):
 
 
 def print_disk_info(disk_info):
-    print("\nPartitions:")
-    text = "\n".join(str(part) for part in disk_info)
-    print(text)
+    # Build the whole block, then write it once (same text as the old print() calls)
+    parts = ["\nPartitions:\n"]
+    parts.extend(f"{part}\n" for part in disk_info)
+    if not disk_info:
+        parts.append("\n")
 
     for disk in disk_info:
-        if "USB" in disk.mountpoint:
-            print(f"USB Volume detected at partition {disk.mountpoint}")
+        # get_disk_info() returns dicts; psutil partitions are namedtuples
+        mountpoint = disk["mountpoint"] if isinstance(disk, dict) else disk.mountpoint
+        if "USB" in mountpoint:
+            parts.append(f"USB Volume detected at partition {mountpoint}\n")
         else:
-            print(f"No USB device {disk.mountpoint}.")
+            parts.append(f"No USB device {mountpoint}.\n")
 
+    sys.stdout.write("".join(parts))
     return disk_info
 
 
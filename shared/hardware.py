@@ -1,6 +1,55 @@
-import psutil # https://pypi.org/project/psutil/
+import threading
 from typing import Any
 
+# psutil (https://pypi.org/project/psutil/) is imported inside each collector so
+# importing this module stays cheap; after the first call the import is a dict lookup.
+
+# -----------------------------
+# Background CPU% sampler
+# -----------------------------
+# cpu_percent() without an interval compares against the previous call in this
+# process, so a one-off snapshot is often 0.0 or covers an arbitrary window.
+# A daemon thread measures fixed 1-second windows instead and get_cpu_info()
+# just reads the latest result. The thread only exists if the caller starts it
+# with start_cpu_sampler() (main.py does, first thing).
+_CPU_SAMPLE_INTERVAL_S = 1.0
+# get_cpu_info() waits at most this long for the first window: one interval
+# plus a little for thread start-up and the psutil import.
+_CPU_FIRST_SAMPLE_WAIT_S = _CPU_SAMPLE_INTERVAL_S + 0.25
+
+_cpu_sample: tuple[list[float], float] | None = None    # (per_core, total)
+_cpu_sample_ready = threading.Event()
+_cpu_sampler: threading.Thread | None = None
+_cpu_sampler_lock = threading.Lock()
+
+
+def _cpu_sampler_loop() -> None:
+    import psutil
+    global _cpu_sample
+
+    psutil.cpu_percent()        # prime the total counter; per-core is primed by the interval call
+    while True:
+        per_core = psutil.cpu_percent(interval=_CPU_SAMPLE_INTERVAL_S, percpu=True)
+        total = psutil.cpu_percent()    # same window as per_core
+        _cpu_sample = (per_core, total)
+        _cpu_sample_ready.set()
+
+
+def start_cpu_sampler() -> None:
+    """
+    Start the CPU% sampler thread if it isn't running yet (idempotent).
+
+    This starts a daemon thread that wakes once per second for the rest of
+    the process; call it early (before collectors run) so the first window
+    is done by the time get_cpu_info() needs it.
+    """
+    global _cpu_sampler
+    with _cpu_sampler_lock:
+        if _cpu_sampler is None:
+            _cpu_sampler = threading.Thread(target=_cpu_sampler_loop, name="cpu-sampler", daemon=True)
+            _cpu_sampler.start()
+
+
 # -----------------------------
 # CPU Information
 # -----------------------------
@@ -10,11 +59,24 @@ def get_cpu_info():
 
     Notes:
       - cpu_freq() can return None on some platforms/VMs.
-      - cpu_percent() without an interval is a quick snapshot (may be 0.0 on first call).
+      - If start_cpu_sampler() was called, usage_percent is the sampler's last
+        1-second window; when the first window isn't done yet this waits for
+        it (at most ~1 interval). get_cpu_info() never starts the thread
+        itself: without it, usage_percent is a quick snapshot (may be 0.0 on
+        first call).
     """
+    import psutil
+
     freq = psutil.cpu_freq()
     cpu_times = psutil.cpu_times()
 
+    if _cpu_sampler is not None:
+        _cpu_sample_ready.wait(_CPU_FIRST_SAMPLE_WAIT_S)
+    sample = _cpu_sample
+    if sample is None:
+        sample = (psutil.cpu_percent(percpu=True), psutil.cpu_percent())
+    per_core, total = sample
+
     return {
         "physical_cores": psutil.cpu_count(logical=False),
         "total_cores": psutil.cpu_count(logical=True),
@@ -24,8 +86,8 @@ def get_cpu_info():
             "current": freq.current,
         },
         "usage_percent": {
-            "per_core": psutil.cpu_percent(percpu=True),
-            "total": psutil.cpu_percent(),
+            "per_core": list(per_core),
+            "total": total,
         },
         "cpu_times": cpu_times._asdict() if cpu_times else None,
     }
@@ -41,6 +103,8 @@ def get_battery_info():
     Notes:
       - Many desktops and some VMs return None.
     """
+    import psutil
+
     b = psutil.sensors_battery()
     if not b:
         return None
@@ -56,6 +120,8 @@ def get_memory_info():
     """
     Return memory information in a JSON-friendly dict.
     """
+    import psutil
+
     vm = psutil.virtual_memory()
     sm = psutil.swap_memory()
 
@@ -73,6 +139,8 @@ def get_disk_info() -> list[dict[str, Any]]:
     If disk_usage fails for a mount (permissions, removable media, pseudo FS),
     we store the error and continue.
     """
+    import psutil
+
     results: list[dict[str, Any]] = []
     partitions = psutil.disk_partitions(all=False)
 
@@ -1,10 +1,51 @@
-from typing import Any
+from typing import Any, Iterator
+import json
+import platform
 import psutil
 import socket
 
+from helpers.cache import ttl_cache
+from shared import network_linux, network_windows
+
+# On Linux, sockets are listed over NETLINK_SOCK_DIAG (see network_linux)
+# instead of psutil's /proc/net + /proc/*/fd scan.
+_IS_LINUX = platform.system() == "Linux"
+_IS_WINDOWS = platform.system() == "Windows"
+
+# orjson is optional (same as core/report.py): used by the *_json variants
+# below, with the stdlib encoder as fallback.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Address family -> label, for the O(1) path of _family_to_label.
+# MAC families differ per OS: AF_PACKET (Linux), AF_LINK (macOS/BSD), and
+# psutil.AF_LINK covers whatever psutil uses on the current platform (-1 on Windows).
+_FAMILY_LABELS: dict[int, str] = {
+    int(fam): "MAC"
+    for fam in (getattr(socket, "AF_PACKET", None), getattr(socket, "AF_LINK", None), psutil.AF_LINK)
+    if fam is not None
+}
+_FAMILY_LABELS.update({int(socket.AF_INET): "IPv4", int(socket.AF_INET6): "IPv6"})
+
+
 def _family_to_label(fam: object) -> str:
     """
     Convert a psutil "address family" value into a human-readable label.
+    Known families are a dict lookup (IntEnum members hash like their int);
+    anything else goes through _slow_family_label.
+    """
+    try:
+        label = _FAMILY_LABELS.get(fam)
+    except TypeError:
+        label = None    # unhashable; let the slow path deal with it
+    return label if label is not None else _slow_family_label(fam)
+
+
+def _slow_family_label(fam: object) -> str:
+    """
+    Convert a psutil "address family" value into a human-readable label.
 
     Why this exists:
       - psutil returns families as platform-specific values (enums / ints)
@@ -48,18 +89,109 @@ def _laddr_ip_port(laddr: Any) -> tuple[str | None, int | None]:
     port = getattr(laddr, "port", None)
     if ip is not None and port is not None:
         return ip, port
-    # fall back to tuple indexing
-    try:
+    # fall back to tuple indexing; checked up front rather than try/except,
+    # since this runs once per socket row
+    if isinstance(laddr, (tuple, list)) and len(laddr) >= 2:
         return laddr[0], laddr[1]
-    except Exception:
-        return None, None
+    return None, None
+
 
+# Interfaces rarely change, but the psutil calls aren't free (on Windows each
+# is a GetAdaptersAddresses sizing+fetch plus per-interface queries), so
+# back-to-back get_net_addr() calls share one snapshot for a couple of seconds.
+_IFACE_TTL_S = 2
 
-def get_net_addr() -> list[dict[str, Any]]:
+
+@ttl_cache(seconds=_IFACE_TTL_S)
+def _if_snapshot() -> tuple[dict[str, list[Any]], dict[str, Any]]:
+    """Raw (net_if_addrs(), net_if_stats()) pair; treat as read-only."""
+    # net_if_addrs(): dict[str, list[snicaddr]]
+    # Example:
+    #   {
+    #     "en0": [snicaddr(...), snicaddr(...), ...],
+    #     "lo0": [...],
+    #   }
+    # net_if_stats(): dict[str, snicstats]
+    # Example:
+    #   {
+    #     "en0": snicstats(isup=True, duplex=..., speed=1000, mtu=1500),
+    #     "lo0": snicstats(...),
+    #   }
+    return psutil.net_if_addrs(), psutil.net_if_stats()
+
+
+# Loopback (127.0.0.0/8) and IPv6 link-local (fe80::/10, possibly with a
+# "%en0" zone suffix) prefixes; "::1" is matched exactly so it can't catch
+# real addresses like "::1:2".
+_LOCAL_ONLY_PREFIXES = ("127.", "fe80:")
+
+
+def _is_local_only(address: str) -> bool:
+    """True for loopback and link-local IPs (MAC strings never match)."""
+    return address == "::1" or address.startswith(_LOCAL_ONLY_PREFIXES)
+
+
+def _build_iface_record(
+    iface_name: str, stats: Any, addr_list: list[Any], include_loopback: bool = True
+) -> dict[str, Any]:
+    """
+    Build the get_net_addr record for one interface.
+    iface_name is a string like "en0", "lo0", "Wi-Fi", "Ethernet".
+    addr_list is psutil's list of snicaddr entries for that interface.
+    With include_loopback=False, loopback and link-local entries are dropped.
+    """
+    return {
+        # The interface name is the key that ties everything together.
+        "name": iface_name,
+
+        # Stats can be missing, especially for odd/virtual interfaces.
+        # We store None rather than crashing.
+        "stats": None if stats is None else {
+            # True/False if the interface is currently up.
+            "isup": stats.isup,
+
+            # Duplex may be an enum/int. Use .name if present, otherwise str().
+            "duplex": getattr(stats.duplex, "name", str(stats.duplex)),
+
+            # Link speed in Mbps. Often 0/unknown on some adapters.
+            "speed_mbps": stats.speed,
+
+            # MTU size. Sometimes 0/unknown depending on platform.
+            "mtu": stats.mtu,
+        },
+
+        # Each interface can have multiple address entries:
+        # MAC + IPv4 + IPv6, sometimes multiple IPv6 or multiple IPv4.
+        # These entries have fields like family/address/netmask/broadcast/ptp;
+        # snicaddr always has them, they're None when not applicable.
+        "addresses": [
+            {
+                # Convert family enum/int into a readable label.
+                "family": _family_to_label(a.family),
+                # The actual IP or MAC string.
+                "address": a.address,
+                "netmask": a.netmask,
+                "broadcast": a.broadcast,
+                "ptp": a.ptp,
+            }
+            for a in addr_list
+            if include_loopback or not _is_local_only(a.address)
+        ],
+    }
+
+
+def get_net_addr(force: bool = False, include_loopback: bool = True) -> list[dict[str, Any]]:
     """
     Return a JSON-friendly inventory of network interfaces.
 
     This is "inventory" data (facts), not a security PASS/FAIL check.
+    The underlying psutil snapshot is reused for up to _IFACE_TTL_S seconds;
+    pass force=True to re-read it. Each call still returns fresh dicts.
+
+    include_loopback=False leaves out loopback (127.0.0.0/8, ::1) and IPv6
+    link-local (fe80::) addresses, which the report rarely needs. Interfaces
+    themselves are always listed (lo/lo0 just ends up with only its MAC, or
+    no addresses at all).
 
     Data sources:
       - psutil.net_if_addrs():
@@ -87,157 +219,184 @@ def get_net_addr() -> list[dict[str, Any]]:
         ]
       }
     """
-    results: list[dict[str, Any]] = []
+    return list(_iter_net_addr(force, include_loopback))
 
-    # net_if_addrs(): dict[str, list[snicaddr]]
-    # Example:
-    #   {
-    #     "en0": [snicaddr(...), snicaddr(...), ...],
-    #     "lo0": [...],
-    #   }
-    if_addr = psutil.net_if_addrs()
 
-    # net_if_stats(): dict[str, snicstats]
-    # Example:
-    #   {
-    #     "en0": snicstats(isup=True, duplex=..., speed=1000, mtu=1500),
-    #     "lo0": snicstats(...),
-    #   }
-    if_stats = psutil.net_if_stats()
+def _iter_net_addr(force: bool = False, include_loopback: bool = True) -> Iterator[dict[str, Any]]:
+    """Yield get_net_addr's interface records one at a time."""
+    if force:
+        _if_snapshot.cache_clear()
+    if_addr, if_stats = _if_snapshot()
 
-    # Outer loop: iterate interfaces by name.
-    # iface_name is a string like "en0", "lo0", "Wi-Fi", "Ethernet".
-    # addr_list is a list of address entries for that interface.
+    # One record per interface. Stats are a separate dict and some interfaces
+    # (odd/virtual ones) might not have stats, so we use .get() and pass None.
     for iface_name, addr_list in if_addr.items():
-        # Stats are a separate dict. Some interfaces might not have stats,
-        # so we use .get() and handle None.
-        stats = if_stats.get(iface_name)
-
-        # Build the record for THIS interface.
-        iface_record: dict[str, Any] = {
-            # The interface name is the key that ties everything together.
-            "name": iface_name,
-
-            # Stats can be missing, especially for odd/virtual interfaces.
-            # We store None rather than crashing.
-            "stats": None if stats is None else {
-                # True/False if the interface is currently up.
-                "isup": stats.isup,
-
-                # Duplex may be an enum/int. Use .name if present, otherwise str().
-                "duplex": getattr(stats.duplex, "name", str(stats.duplex)),
-
-                # Link speed in Mbps. Often 0/unknown on some adapters.
-                "speed_mbps": stats.speed,
-
-                # MTU size. Sometimes 0/unknown depending on platform.
-                "mtu": stats.mtu,
-            },
-
-            # Each interface can have multiple address entries:
-            # MAC + IPv4 + IPv6, sometimes multiple IPv6 or multiple IPv4.
-            "addresses": [],
-        }
+        yield _build_iface_record(iface_name, if_stats.get(iface_name), addr_list, include_loopback)
 
-        # Inner loop: iterate the address entries for THIS interface.
-        # These entries have fields like family/address/netmask/broadcast/ptp.
-        for a in addr_list:
-            iface_record["addresses"].append({
-                # Convert family enum/int into a readable label.
-                "family": _family_to_label(a.family),
-
-                # The actual IP or MAC string.
-                "address": a.address,
 
-                # These fields exist only sometimes. getattr keeps it safe.
-                "netmask": getattr(a, "netmask", None),
-                "broadcast": getattr(a, "broadcast", None),
-                "ptp": getattr(a, "ptp", None),
-            })
+def _dumps(obj: Any) -> bytes:
+    """Compact UTF-8 JSON bytes; orjson when available, else the stdlib."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
 
-        # Add this interface to the output list.
-        results.append(iface_record)
 
-    return results
+def get_net_addr_json(force: bool = False, include_loopback: bool = True) -> bytes:
+    """get_net_addr() encoded as JSON bytes, for callers that only write it out."""
+    return _dumps(list(_iter_net_addr(force, include_loopback)))
 
 
-def get_listening_ports() -> dict[str, Any]:
+def _net_connections(kind: str) -> tuple[list[Any], str | None, str | None]:
     """
-    Best-effort exposure snapshot (shared/psutil-only):
-      - TCP listeners: status == CONN_LISTEN
-      - UDP bound sockets: type == SOCK_DGRAM and laddr has a port
+    psutil.net_connections() for a single kind ("tcp" or "udp") that never raises.
 
-    Important:
-      - On macOS, psutil.net_connections() may raise AccessDenied unless run as sudo/root.
-      - This function must NEVER crash the whole audit; it returns a structured error.
+    Returns (connections, error, remediation); error/remediation are None on success.
+    Asking for one kind at a time lets psutil skip the socket tables we don't
+    report (e.g. UNIX sockets, or TCP when we want UDP).
+    On Linux, sock_diag is tried first (TCP comes back LISTEN-only) and psutil
+    is only used if netlink isn't available.
     """
-    tcp_results: list[dict[str, Any]] = []
-    udp_results: list[dict[str, Any]] = []
-
-    # ---- Step 1: Acquire connections (this is the privileged call) ----
     try:
-        conns = psutil.net_connections(kind="inet")
+        if _IS_LINUX:
+            try:
+                return network_linux.net_connections(kind), None, None
+            except OSError:
+                pass    # old kernel / sandboxed netlink: fall through to psutil
+        return psutil.net_connections(kind=kind), None, None
     except (psutil.AccessDenied, PermissionError) as e:
-        # Return a JSON-friendly structure your report builder can store.
-        return {
-            "tcp": [],
-            "udp": [],
-            "not_checked": True,
-            "error": f"{type(e).__name__}: {e}",
-            "remediation": "Run the audit with elevated privileges (sudo/root) to enumerate system-wide listening sockets."
-        }
+        return [], f"{type(e).__name__}: {e}", (
+            "Run the audit with elevated privileges (sudo/root) to enumerate system-wide listening sockets."
+        )
     except OSError as e:
         # Some platforms may raise OSError for other reasons (rare).
-        return {
-            "tcp": [],
-            "udp": [],
-            "not_checked": True,
-            "error": f"{type(e).__name__}: {e}",
-            "remediation": "Could not enumerate sockets due to an OS error. Try running as sudo/root and re-test."
-        }
+        return [], f"{type(e).__name__}: {e}", (
+            "Could not enumerate sockets due to an OS error. Try running as sudo/root and re-test."
+        )
+
+
+_SENTINEL = object()
+
 
-    # ---- Step 2: Parse and categorise results ----
+def _process_name(pid: int | None, cache: dict[int, str | None]) -> str | None:
+    """
+    Best-effort process name (may fail even when the connection lookup succeeded).
+
+    Daemons usually hold several sockets, so names are cached per pid in
+    `cache` (one dict per get_listening_ports call; pids get reused over time).
+    A failed lookup is cached as None too, so it isn't retried per socket.
+    """
+    # pid 0 is the kernel's System Idle Process on Windows (and never a real
+    # owner on Linux/macOS); psutil.Process(0) only ever ends in AccessDenied
+    # or a useless name, so don't pay for the raise/catch per row.
+    if pid is None or pid <= 0:
+        return None
+    name = cache.get(pid, _SENTINEL)
+    if name is _SENTINEL:
+        try:
+            name = psutil.Process(pid).name()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            # Process exited since the socket scan, or belongs to another user
+            name = None
+        cache[pid] = name
+    return name
+
+
+def _bound(conns: Any):
+    """Yield (conn, ip, port) for connections whose local address has a port."""
     for c in conns:
         ip, port = _laddr_ip_port(c.laddr)
-        if port is None:
-            continue
+        if port is not None:
+            yield c, ip, port
 
-        fam = _family_to_label(c.family)
-        pid = c.pid
 
-        # Best-effort process name (may fail even when conns succeeded)
-        proc_name = None
-        if pid is not None:
-            try:
-                proc_name = psutil.Process(pid).name()
-            except Exception:
-                proc_name = None
-
-        # TCP listener
-        if c.type == socket.SOCK_STREAM and c.status == psutil.CONN_LISTEN:
-            tcp_results.append({
-                "ip": ip,
-                "port": port,
-                "family": fam,
-                "pid": pid,
-                "process_name": proc_name,
-            })
-            continue
-
-        # UDP bound socket (no LISTEN state for UDP)
-        if c.type == socket.SOCK_DGRAM:
-            udp_results.append({
-                "ip": ip,
-                "port": port,
-                "family": fam,
-                "pid": pid,
-                "process_name": proc_name,
-            })
+_LISTENER_KINDS = frozenset({"tcp", "udp"})
+
+
+def _listener_dicts(
+    rows: list[tuple[Any, str | None, int]], proc_cache: dict[int, str | None]
+) -> list[dict[str, Any]]:
+    """
+    Output rows for get_listening_ports, built straight into their final dict
+    form: the report serializes them as JSON objects, and a NamedTuple per
+    row would just be converted back with _asdict() (several times slower
+    than the literal) before it got there.
+    """
+    # Thousands of rows but only AF_INET/AF_INET6 in practice: label each
+    # distinct family once, then it's one dict probe per row.
+    labels = {family: _family_to_label(family) for family in {c.family for c, _, _ in rows}}
+    return [
+        {
+            "ip": ip,
+            "port": port,
+            "family": labels[c.family],
+            "pid": c.pid,
+            "process_name": _process_name(c.pid, proc_cache),
+        }
+        for c, ip, port in rows
+    ]
+
+
+def get_listening_ports(kinds: tuple[str, ...] = ("tcp", "udp")) -> dict[str, Any]:
+    """
+    Best-effort exposure snapshot (shared/psutil-only):
+      - TCP listeners: status == CONN_LISTEN
+      - UDP bound sockets: laddr has a port
+
+    Important:
+      - On macOS, psutil.net_connections() may raise AccessDenied unless run as sudo/root.
+      - This function must NEVER crash the whole audit; it returns a structured error.
+      - TCP and UDP are enumerated separately, so if one fails the other's
+        results are still returned (not_checked is only True if every
+        requested kind fails).
+      - kinds selects which of "tcp"/"udp" to enumerate. The default keeps the
+        full TCP + UDP snapshot; pass ("tcp",) to skip the UDP walk, which is
+        the expensive half on busy hosts. A family that wasn't requested is
+        reported as None (not []), so the output keys stay the same.
+        Unknown kinds raise ValueError.
+    """
+    unknown = set(kinds) - _LISTENER_KINDS
+    if unknown:
+        raise ValueError(f"Unknown kinds {sorted(unknown)!r}; expected a subset of {sorted(_LISTENER_KINDS)!r}")
+    want_tcp = "tcp" in kinds
+    want_udp = "udp" in kinds
+
+    # ---- Step 1: Acquire connections (these are the privileged calls) ----
+    tcp_conns, tcp_error, tcp_remediation = _net_connections("tcp") if want_tcp else ([], None, None)
+    udp_conns, udp_error, udp_remediation = _net_connections("udp") if want_udp else ([], None, None)
+
+    # ---- Step 2: Pick the rows we report ----
+    # TCP listeners only; UDP sockets with a bound port (no LISTEN state for UDP)
+    tcp_rows = list(_bound(c for c in tcp_conns if c.status == psutil.CONN_LISTEN))
+    udp_rows = list(_bound(udp_conns))
+
+    # ---- Step 3: Resolve process names ----
+    # Linux: one /proc/<pid>/comm read per distinct pid. Windows: one Toolhelp
+    # process snapshot for all of them. Pids missing here (or everything, if
+    # the batch lookup fails) go through psutil as usual.
+    proc_cache: dict[int, str | None] = {}
+    if _IS_LINUX or _IS_WINDOWS:
+        pids = {c.pid for c, _, _ in tcp_rows + udp_rows if c.pid is not None and c.pid > 0}
+        try:
+            names = (network_linux if _IS_LINUX else network_windows).pid_names(pids)
+        except (OSError, AttributeError):
+            names = {}
+        proc_cache.update(names)
+
+    tcp_results = _listener_dicts(tcp_rows, proc_cache)
+    udp_results = _listener_dicts(udp_rows, proc_cache)
+
+    requested = [(kind, err) for kind, want, err in (("tcp", want_tcp, tcp_error), ("udp", want_udp, udp_error)) if want]
+    errors = [f"{kind}: {err}" for kind, err in requested if err]
 
     return {
-        "tcp": tcp_results,
-        "udp": udp_results,
-        "not_checked": False,
-        "error": None,
-        "remediation": None
-    }
\ No newline at end of file
+        "tcp": tcp_results if want_tcp else None,
+        "udp": udp_results if want_udp else None,
+        "not_checked": bool(requested) and all(err is not None for _, err in requested),
+        "error": "; ".join(errors) or None,
+        "remediation": tcp_remediation or udp_remediation
+    }
+
+
+def get_listening_ports_json(kinds: tuple[str, ...] = ("tcp", "udp")) -> bytes:
+    """get_listening_ports() encoded as JSON bytes, for callers that only write it out."""
+    return _dumps(get_listening_ports(kinds))
@@ -0,0 +1,188 @@
+"""
+    Linux socket enumeration over NETLINK_SOCK_DIAG (what `ss` uses).
+
+    psutil.net_connections() on Linux parses every /proc/net/{tcp,udp}* table
+    and then readlinks every /proc/<pid>/fd/* to attach PIDs. Here the kernel
+    filters for us (TCP: LISTEN only) and we only resolve the inodes of the
+    sockets we actually return.
+"""
+import os
+import socket
+import struct
+from typing import Any, NamedTuple
+
+from helpers.unix import read_small_file
+
+
+# sock_diag constants (linux/netlink.h, linux/sock_diag.h, linux/inet_diag.h)
+_NETLINK_SOCK_DIAG = 4
+_SOCK_DIAG_BY_FAMILY = 20
+_NLM_F_REQUEST = 0x1
+_NLM_F_DUMP = 0x300
+_NLMSG_ERROR = 2
+_NLMSG_DONE = 3
+_TCP_LISTEN = 10
+_ALL_STATES = 0xFFFFFFFF
+
+_NLMSGHDR = struct.Struct("=IHHII")     # len, type, flags, seq, pid
+# inet_diag_req_v2: family, protocol, ext, pad, states, then inet_diag_sockid
+# (sport, dport in network byte order; src/dst as 16 raw bytes; if; cookie[2])
+_INET_DIAG_REQ_V2 = struct.Struct("=BBBBIHH16s16sI8s")
+# inet_diag_msg: family, state, timer, retrans, inet_diag_sockid, expires,
+# rqueue, wqueue, uid, inode
+_INET_DIAG_MSG = struct.Struct("=BBBBHH16s16sI8sIIIII")
+
+# States as psutil reports them (psutil.CONN_LISTEN / psutil.CONN_NONE)
+_STATUS_LISTEN = "LISTEN"
+_STATUS_NONE = "NONE"
+
+_PROTOCOLS = {
+    "tcp": (socket.IPPROTO_TCP, socket.SOCK_STREAM, 1 << _TCP_LISTEN),
+    "udp": (socket.IPPROTO_UDP, socket.SOCK_DGRAM, _ALL_STATES),
+}
+
+
+def _nl_align(n: int) -> int:
+    return (n + 3) & ~3
+
+
+class Addr(NamedTuple):
+    ip: str
+    port: int
+
+
+class DiagConn(NamedTuple):
+    """Same field names as psutil's sconn, so callers can treat both alike."""
+    fd: int
+    family: socket.AddressFamily
+    type: socket.SocketKind
+    laddr: Addr | tuple
+    raddr: Addr | tuple
+    status: str
+    pid: int | None
+
+
+def _decode_addr(family: int, raw: bytes, port: int) -> Addr | tuple:
+    port = socket.ntohs(port)
+    # Like psutil: an unbound/unconnected endpoint (port 0) is ()
+    if not port:
+        return ()
+    if family == socket.AF_INET:
+        return Addr(socket.inet_ntop(socket.AF_INET, raw[:4]), port)
+    return Addr(socket.inet_ntop(socket.AF_INET6, raw), port)
+
+
+def _dump(sock: socket.socket, family: int, protocol: int, states: int, seq: int) -> list[tuple]:
+    """One SOCK_DIAG_BY_FAMILY dump; returns unpacked inet_diag_msg tuples."""
+    request = _INET_DIAG_REQ_V2.pack(family, protocol, 0, 0, states, 0, 0, b"", b"", 0, b"")
+    sock.send(_NLMSGHDR.pack(
+        _NLMSGHDR.size + len(request), _SOCK_DIAG_BY_FAMILY, _NLM_F_REQUEST | _NLM_F_DUMP, seq, 0
+    ) + request)
+
+    rows: list[tuple] = []
+    while True:
+        data = sock.recv(65536)
+        offset = 0
+        while offset + _NLMSGHDR.size <= len(data):
+            msg_len, msg_type, _, _, _ = _NLMSGHDR.unpack_from(data, offset)
+            if msg_len < _NLMSGHDR.size:
+                raise OSError("Malformed netlink message")
+            if msg_type == _NLMSG_DONE:
+                return rows
+            if msg_type == _NLMSG_ERROR:
+                err = -struct.unpack_from("=i", data, offset + _NLMSGHDR.size)[0]
+                raise OSError(err, os.strerror(err))
+            if msg_type == _SOCK_DIAG_BY_FAMILY:
+                rows.append(_INET_DIAG_MSG.unpack_from(data, offset + _NLMSGHDR.size))
+            offset += _nl_align(msg_len)
+
+
+def _inode_pids(wanted: set[int]) -> dict[int, int]:
+    """
+    Map socket inodes to the pid holding them with one walk over /proc/*/fd.
+    Stops as soon as every wanted inode is found. Processes we can't inspect
+    (other users without root, exited mid-walk) are skipped, as psutil does.
+    """
+    found: dict[int, int] = {}
+    if not wanted:
+        return found
+    remaining = set(wanted)
+    for entry in os.scandir("/proc"):
+        if not entry.name.isdigit():
+            continue
+        fd_dir = f"/proc/{entry.name}/fd"
+        try:
+            fds = os.listdir(fd_dir)
+        except OSError:
+            continue
+        for fd in fds:
+            try:
+                target = os.readlink(f"{fd_dir}/{fd}")
+            except OSError:
+                continue
+            # "socket:[12345]"
+            if not target.startswith("socket:["):
+                continue
+            inode = int(target[8:-1])
+            if inode in remaining:
+                found[inode] = int(entry.name)
+                remaining.discard(inode)
+                if not remaining:
+                    return found
+    return found
+
+
+def net_connections(kind: str) -> list[DiagConn]:
+    """
+    psutil.net_connections(kind)-style rows for kind "tcp" or "udp" (IPv4 + IPv6).
+
+    TCP is limited to LISTEN sockets by the kernel-side state filter, since
+    that's all get_listening_ports reports. fd is -1 (as psutil does for
+    system-wide queries).
+    Raises OSError if sock_diag is unavailable (old kernel, sandbox, non-Linux).
+    """
+    protocol, sock_type, states = _PROTOCOLS[kind]
+    status = _STATUS_LISTEN if sock_type == socket.SOCK_STREAM else _STATUS_NONE
+
+    rows: list[tuple[Any, ...]] = []
+    with socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, _NETLINK_SOCK_DIAG) as sock:
+        sock.settimeout(2)
+        for seq, family in enumerate((socket.AF_INET, socket.AF_INET6), start=1):
+            rows.extend(_dump(sock, family, protocol, states, seq))
+
+    # Tuple positions from _INET_DIAG_MSG: 0 family, 4 sport, 5 dport,
+    # 6 src, 7 dst, 14 inode
+    pids = _inode_pids({row[14] for row in rows if row[14]})
+
+    return [
+        DiagConn(
+            fd=-1,
+            family=socket.AddressFamily(row[0]),
+            type=sock_type,
+            laddr=_decode_addr(row[0], row[6], row[4]),
+            raddr=_decode_addr(row[0], row[7], row[5]),
+            status=status,
+            pid=pids.get(row[14]),
+        )
+        for row in rows
+    ]
+
+
+def pid_names(pids: set[int]) -> dict[int, str]:
+    """
+    Process names for `pids` from /proc/<pid>/comm (one tiny read each,
+    instead of building a psutil.Process per pid).
+
+    comm is cut at 15 characters (TASK_COMM_LEN - 1); names that long are
+    left out so the caller can fall back to psutil, which recovers the full
+    name from cmdline. Pids that exited or can't be read are left out too.
+    """
+    names: dict[int, str] = {}
+    for pid in pids:
+        try:
+            name = read_small_file(f"/proc/{pid}/comm", 64).rstrip("\n")
+        except OSError:
+            continue
+        if name and len(name) < 15:
+            names[pid] = name
+    return names
@@ -0,0 +1,65 @@
+"""
+    Windows process-name lookup for listener rows via a Toolhelp snapshot.
+
+    psutil.Process(pid).name() opens each process separately (one OpenProcess
+    per pid, AccessDenied for services we don't own). A single
+    CreateToolhelp32Snapshot(TH32CS_SNAPPROCESS) lists every (pid, exe name)
+    pair without opening any process.
+"""
+import ctypes
+from ctypes import wintypes
+
+
+_TH32CS_SNAPPROCESS = 0x00000002
+_INVALID_HANDLE_VALUE = ctypes.c_void_p(-1).value
+
+
+class _ProcessEntry32W(ctypes.Structure):
+    _fields_ = [
+        ("dwSize", wintypes.DWORD),
+        ("cntUsage", wintypes.DWORD),
+        ("th32ProcessID", wintypes.DWORD),
+        ("th32DefaultHeapID", ctypes.c_size_t),
+        ("th32ModuleID", wintypes.DWORD),
+        ("cntThreads", wintypes.DWORD),
+        ("th32ParentProcessID", wintypes.DWORD),
+        ("pcPriClassBase", wintypes.LONG),
+        ("dwFlags", wintypes.DWORD),
+        ("szExeFile", wintypes.WCHAR * 260),
+    ]
+
+
+def pid_names(pids: set[int]) -> dict[int, str]:
+    """
+    Process names (exe file name, as psutil reports them) for `pids`,
+    from one process snapshot. Pids not in the snapshot (exited) are left
+    out so the caller can fall back to psutil.
+    Raises OSError if the snapshot can't be taken (AttributeError off Windows).
+    """
+    names: dict[int, str] = {}
+    if not pids:
+        return names
+
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    kernel32.CreateToolhelp32Snapshot.restype = wintypes.HANDLE
+    kernel32.CreateToolhelp32Snapshot.argtypes = [wintypes.DWORD, wintypes.DWORD]
+    kernel32.Process32FirstW.argtypes = [wintypes.HANDLE, ctypes.POINTER(_ProcessEntry32W)]
+    kernel32.Process32NextW.argtypes = [wintypes.HANDLE, ctypes.POINTER(_ProcessEntry32W)]
+    kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+
+    snapshot = kernel32.CreateToolhelp32Snapshot(_TH32CS_SNAPPROCESS, 0)
+    if snapshot is None or snapshot == _INVALID_HANDLE_VALUE:
+        raise ctypes.WinError(ctypes.get_last_error())
+    try:
+        entry = _ProcessEntry32W()
+        entry.dwSize = ctypes.sizeof(entry)
+        ok = kernel32.Process32FirstW(snapshot, ctypes.byref(entry))
+        while ok:
+            if entry.th32ProcessID in pids:
+                names[entry.th32ProcessID] = entry.szExeFile
+                if len(names) == len(pids):
+                    break
+            ok = kernel32.Process32NextW(snapshot, ctypes.byref(entry))
+    finally:
+        kernel32.CloseHandle(snapshot)
+    return names
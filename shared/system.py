@@ -1,31 +1,43 @@
 """
     Shared utility functions for system information retrieval.
 """
+import functools
 import platform
 import psutil
 
+@functools.lru_cache(maxsize=1)
+def _system_info_snapshot():
+    """
+        platform.* values don't change for the life of the process, and
+        platform.processor() can shell out, so read them once.
+        Kept as a tuple so the cached value can't be mutated by callers.
+    """
+    return (
+        ("os", platform.system()),
+        ("os_version", platform.version()),
+        ("machine", platform.machine()),
+        ("processor", platform.processor()),
+    )
+
 def get_system_info():
     """Retrieve basic system information."""
-    system_info = {
-        "os": platform.system(),
-        "os_version": platform.version(),
-        "machine": platform.machine(),
-        "processor": platform.processor(),
-    }
+    # Fresh dict per call (callers may add to it); the lookups are cached.
+    system_info = dict(_system_info_snapshot())
     return system_info
 
+_OS_LABELS = {
+    "Windows": "This is Windows OS",
+    "Linux": "This is Linux OS",
+    "Darwin": "This is macOS",
+}
+
+@functools.lru_cache(maxsize=1)
 def get_os():
     """
         Returns a value based on the current operating system.
         Used in main.py as a switch case for different OS-specific implementations.
     """
-    operating_system = platform.system()
-    switcher = {
-        "Windows": "This is Windows OS",
-        "Linux": "This is Linux OS",
-        "Darwin": "This is macOS",
-    }
-    return switcher.get(operating_system, "Unknown Operating System")
+    return _OS_LABELS.get(platform.system(), "Unknown Operating System")
 
 def get_user_information():
     """ Retrieve all user information"""